@@ -1,5 +1,6 @@
 import pyglet as pg
 import math
+import numpy as np
 from random import randint
 
 WINDOW_HEIGHT: int = 1000
@@ -11,6 +12,14 @@ BORDER_THICKNESS: int = 1
 
 WIND_VECTOR: int = [0, 0];
 
+# below this many pixels per tile the grid is drawn as a tree density image instead of per-tile rectangles
+LOD_MIN_TILE_PIXELS: int = 4
+MAX_TILE_PIXELS: int = 64
+ZOOM_STEP: float = 1.25
+EMPTY_COLOR = (255, 75, 75)
+TREE_COLOR = (255, 255, 255)
+TILE_OPACITY: int = 150
+
 window = pg.window.Window(width=WINDOW_WIDTH, height=WINDOW_HEIGHT, caption="XYLONOMIAL")
 batch = pg.graphics.Batch()
 sq_width: int = WINDOW_WIDTH / WIDTH_TILES
@@ -18,6 +27,13 @@ sq_height: int = WINDOW_HEIGHT / HEIGHT_TILES
 
 rendered_grid_squares = []
 
+# viewport: the tile at the window's bottom left and the zoom relative to fitting the whole grid
+view_x: float = 0.0
+view_y: float = 0.0
+view_zoom: float = 1.0
+grid_version = 0 # bumped whenever a tile changes, so draw_grid knows to rebuild
+drawn_view = None
+
 def get_direction(xpos, ypos):
     return randint(0, 360)
 
@@ -43,62 +59,132 @@ class Tile:
         if self.has_tree: self.tree_age += 1;
 
 grid = []
+tree_mask = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=bool) # mirrors has_tree so drawing can work on whole arrays
 
 for x in range(WIDTH_TILES):
     grid.append([])
     for y in range(HEIGHT_TILES):
         grid[x].append(Tile())
 
+def plant_tree(x, y):
+    global grid_version
+    grid[x][y].has_tree = True
+    tree_mask[x, y] = True
+    grid_version += 1
+
 # bottom left is 0, 0
 
-grid[0][2].has_tree = True;
-grid[28][28].has_tree = True;
-        
+plant_tree(0, 2)
+plant_tree(28, 28)
+
+
+def tile_pixels():
+    return sq_width * view_zoom, sq_height * view_zoom
+
+def clamp_view():
+    global view_x, view_y
+    tile_w, tile_h = tile_pixels()
+    view_x = max(0.0, min(WIDTH_TILES - WINDOW_WIDTH / tile_w, view_x))
+    view_y = max(0.0, min(HEIGHT_TILES - WINDOW_HEIGHT / tile_h, view_y))
+
+def visible_region():
+    tile_w, tile_h = tile_pixels()
+    x0, y0 = int(view_x), int(view_y)
+    x1 = min(WIDTH_TILES, math.ceil(view_x + WINDOW_WIDTH / tile_w))
+    y1 = min(HEIGHT_TILES, math.ceil(view_y + WINDOW_HEIGHT / tile_h))
+    return x0, x1, y0, y1
 
 def draw_grid():
+    global drawn_view
+    # only rebuild the shapes when the grid has changed or the view has moved
+    if drawn_view == (grid_version, view_x, view_y, view_zoom):
+        return
+    drawn_view = (grid_version, view_x, view_y, view_zoom)
+
     for square in rendered_grid_squares:
         square.delete()
     rendered_grid_squares.clear()
 
-    for i in range(WIDTH_TILES):
-        for j in range(HEIGHT_TILES):
-            x = i * sq_width
-            y = j * sq_height
+    tile_w, tile_h = tile_pixels()
+    if min(tile_w, tile_h) >= LOD_MIN_TILE_PIXELS:
+        draw_tile_detail()
+    else:
+        draw_density_map()
+
+def draw_tile_detail():
+    tile_w, tile_h = tile_pixels()
+    x0, x1, y0, y1 = visible_region()
+
+    for i in range(x0, x1):
+        for j in range(y0, y1):
+            x = (i - view_x) * tile_w
+            y = (j - view_y) * tile_h
 
             border_rect = pg.shapes.Rectangle(
-                x, y, sq_width, sq_height, 
+                x, y, tile_w, tile_h, 
                 color=(100, 100, 100), 
                 batch=batch
             )
 
-            fill_rect = None
-
-            if grid[i][j].has_tree:
-                fill_rect = pg.shapes.Rectangle(
-                    x + BORDER_THICKNESS, 
-                    y + BORDER_THICKNESS, 
-                    sq_width - 2 * BORDER_THICKNESS, 
-                    sq_height - 2 * BORDER_THICKNESS, 
-                    color=(255, 255, 255), 
-                    batch=batch
-                )
-                fill_rect.opacity = 150  
-            else:
-                fill_rect = pg.shapes.Rectangle(
-                    x + BORDER_THICKNESS, 
-                    y + BORDER_THICKNESS, 
-                    sq_width - 2 * BORDER_THICKNESS, 
-                    sq_height - 2 * BORDER_THICKNESS, 
-                    color=(255, 75, 75), 
-                    batch=batch
-                )
-                fill_rect.opacity = 150 
+            fill_rect = pg.shapes.Rectangle(
+                x + BORDER_THICKNESS, 
+                y + BORDER_THICKNESS, 
+                tile_w - 2 * BORDER_THICKNESS, 
+                tile_h - 2 * BORDER_THICKNESS, 
+                color=TREE_COLOR if grid[i][j].has_tree else EMPTY_COLOR, 
+                batch=batch
+            )
+            fill_rect.opacity = TILE_OPACITY
 
             rendered_grid_squares.append(border_rect)
             rendered_grid_squares.append(fill_rect)
 
+def draw_density_map():
+    # sums tiles into blocks of about one pixel and draws the tree density as a single image
+    tile_w, tile_h = tile_pixels()
+    x0, x1, y0, y1 = visible_region()
+    block = max(1, int(1 / min(tile_w, tile_h)))
+    x0, y0 = x0 - x0 % block, y0 - y0 % block  # align blocks to the grid so panning doesn't shimmer
+
+    visible = tree_mask[x0:x1, y0:y1].astype(np.float32)
+    pad_x, pad_y = -visible.shape[0] % block, -visible.shape[1] % block
+    counts = np.pad(visible, ((0, pad_x), (0, pad_y)))
+    counts = sum(counts[k::block] for k in range(block))
+    counts = sum(counts[:, k::block] for k in range(block))
+    widths = np.minimum(block, visible.shape[0] - np.arange(0, visible.shape[0], block))
+    heights = np.minimum(block, visible.shape[1] - np.arange(0, visible.shape[1], block))
+    density = (counts / np.outer(widths, heights))[..., None]
+
+    # opacity is applied against the black background, like the per-tile rectangles
+    rgb = (np.array(EMPTY_COLOR) * (1 - density) + np.array(TREE_COLOR) * density) * (TILE_OPACITY / 255)
+    # pyglet images are stored bottom row first, i.e. [y][x]
+    pixels = np.ascontiguousarray(rgb.astype(np.uint8).transpose(1, 0, 2))
+    image = pg.image.ImageData(pixels.shape[1], pixels.shape[0], 'RGB', pixels.tobytes())
+
+    sprite = pg.sprite.Sprite(image, x=(x0 - view_x) * tile_w, y=(y0 - view_y) * tile_h, batch=batch)
+    sprite.scale_x = visible.shape[0] * tile_w / pixels.shape[1]
+    sprite.scale_y = visible.shape[1] * tile_h / pixels.shape[0]
+    rendered_grid_squares.append(sprite)
 
+@window.event
+def on_mouse_scroll(x, y, scroll_x, scroll_y):
+    # zoom about the cursor so the tile under it stays put
+    global view_x, view_y, view_zoom
+    tile_w, tile_h = tile_pixels()
+    focus_x, focus_y = view_x + x / tile_w, view_y + y / tile_h
+    max_zoom = max(1.0, MAX_TILE_PIXELS / min(sq_width, sq_height))
+    view_zoom = max(1.0, min(max_zoom, view_zoom * ZOOM_STEP ** scroll_y))
+    tile_w, tile_h = tile_pixels()
+    view_x, view_y = focus_x - x / tile_w, focus_y - y / tile_h
+    clamp_view()
 
+@window.event
+def on_mouse_drag(x, y, dx, dy, buttons, modifiers):
+    global view_x, view_y
+    tile_w, tile_h = tile_pixels()
+    view_x -= dx / tile_w
+    view_y -= dy / tile_h
+    clamp_view()
 
 @window.event
 def on_draw():
@@ -3,6 +3,8 @@ import math
 import random
 import numpy as np
 import sys
+import os
+import json
 
 pygame.init()
 pygame.font.init()
@@ -24,6 +26,14 @@ MAST_FREQUENCY_MAX = 7
 MAST_YEAR_MULTIPLIER = 5
 BIRD_MIGRATION_FACTOR = 30
 
+# --- Seed Bank Constants ---
+SEED_DORMANCY_YEARS = 5  # seeds can't germinate until they are this old
+SEED_EXPIRY_YEARS = 30  # seeds older than this are dropped from the bank
+MAX_MOISTURE_FOR_GERMINATION = 0.85
+# One uint8 count per tile for every half-year cohort still alive (ages 0 to SEED_EXPIRY_YEARS)
+SEED_COHORTS = int(SEED_EXPIRY_YEARS / YEARS_PER_UPDATE) + 1
+SEED_DORMANCY_STEPS = int(SEED_DORMANCY_YEARS / YEARS_PER_UPDATE)
+
 # --- Dispersal Constants ---
 ANIMAL_DISPERSAL_PROPORTION = 0.95
 
@@ -36,6 +46,56 @@ WIND_DIRECTION_STD_DEV = 45
 SEED_WIND_MAGNITUDE_FACTOR = 0.8
 WIND_BASE_DISTANCE_MULT = 2.0
 WIND_DISTANCE_VARIATION = 1.5
+# Optional .npy raster of shape (rows, cols, 2) holding the wind (x, y) vector across the map,
+# e.g. from a terrain model. Rows run north to south like the soil rasters.
+WIND_FIELD = None
+# Seasonal change applied to the wind in the autumn/winter half of the year
+WIND_SEASONAL_ROTATION = 0.0  # degrees
+WIND_SEASONAL_STRENGTH = 1.0  # magnitude multiplier
+
+# --- Soil Raster Input ---
+# Set these to load measured soil instead of generating it. Each may be a raw
+# binary file (needs SOIL_RASTER_SHAPE), a .npy file, or a directory of .npy
+# chunks named r{row}_c{col}.npy. Values are expected as 0-1 fractions, with
+# rows running north to south like an image.
+SOIL_MOISTURE_RASTER = None
+SOIL_NUTRIENT_RASTER = None
+SOIL_RASTER_SHAPE = None  # (rows, cols), only needed for raw binary files
+SOIL_RASTER_DTYPE = 'float32'
+SOIL_BLOCK_TILES = 16  # soil is faulted in from the rasters in blocks of this many tiles
+UNLOADED_SOIL_COLOR = (60, 60, 60)
+
+# --- Soil Dynamics Constants ---
+# Soil is stored as 0-1 fractions, so these are fractions per year rather than litres / kgs
+WATER_CONSUMPTION_RATE = 0.002  # moisture used per year by a living tree
+NUTRIENT_CONSUMPTION_RATE = 0.001  # nutrients used per year by a living tree
+# Amount returned to the soil under a tree when it dies
+WATER_RETURN_RATE = 0.05
+NUTRIENT_RETURN_RATE = 0.1
+# Fraction of the difference exchanged with each neighbouring tile per step (keep <= 0.25)
+SOIL_DIFFUSION_RATE = 0.05
+
+# --- Event Log / Replay ---
+RECORD_PATH = None  # directory to record the run's event log and keyframes into
+KEYFRAME_YEARS = 10  # full state is saved this often so replay only applies a few years of events
+REPLAY_PATH = None  # directory of a recorded run to open in the replay viewer instead of simulating
+TIMELINE_HEIGHT = 40
+
+# One fixed-size record per state change. tile is x * HEIGHT_TILES + y.
+EVENT_DTYPE = np.dtype([('step', '<u4'), ('kind', 'u1'), ('tile', '<u4'), ('count', '<u2')])
+EVENT_SEED_LANDED = 0
+EVENT_GERMINATED = 1
+EVENT_DIED = 2
+EVENT_SEED_EXPIRED = 3
+
+# --- Level of Detail ---
+# Below this many pixels per tile the grid is drawn as a density / age heatmap instead of per-tile circles
+LOD_MIN_TILE_PIXELS = 4
+MAX_TILE_PIXELS = 64  # zoom limit
+ZOOM_STEP = 1.25
+YOUNG_TREE_COLOR = (150, 255, 120)
+OLD_TREE_COLOR = (30, 110, 40)  # heatmap colour of trees at SENESCENCE_MIDPOINT and older
+SEED_COLOR = (200, 200, 0)
 
 # --- Tree Mortality Constants ---
 YEARS_PER_UPDATE = 0.5
@@ -72,6 +132,24 @@ sq_height: int = WINDOW_HEIGHT / HEIGHT_TILES
 # --- Simulation State ---
 soil_moisture = np.zeros((WIDTH_TILES, HEIGHT_TILES))
 soil_nutrients = np.zeros((WIDTH_TILES, HEIGHT_TILES))
+tree_mask = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=bool)  # tiles holding a living tree
+died_mask = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=bool)  # tiles whose tree died this step
+tree_birth_step = np.full((WIDTH_TILES, HEIGHT_TILES), -1, dtype=np.int32)  # seed_step each tree germinated, -1 if none
+# Seed counts per cohort. Cohorts form a ring: seeds landing this step go in slot
+# seed_step % SEED_COHORTS, so aging is just advancing seed_step and clearing the expired slot.
+seed_bank = np.zeros((SEED_COHORTS, WIDTH_TILES, HEIGHT_TILES), dtype=np.uint8)
+seed_counts = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=np.int32)  # seed_bank summed over cohorts, kept in step
+seed_step = 0
+grid_version = 0  # bumped whenever the grid changes, so drawing can reuse the last frame
+drawn_frame = None  # (grid_version, view) that grid_surface was last drawn for
+density_pyramid = (None, [])  # (version, levels) of heatmap block sums, see build_density_pyramid
+soil_sources = None  # (moisture, nutrients) rasters when soil is loaded from disk
+soil_block_loaded = None  # which SOIL_BLOCK_TILES blocks have been read from the rasters
+record_file = None  # open events.bin while recording
+pending_landings = []  # tile indices of seeds landed since the last flush
+pending_events = []  # (kind, tiles, counts) arrays since the last flush
+wind_field = None  # memory-mapped WIND_FIELD raster, if one is set
+wind_blocks = {}  # (bx, by) -> per-tile (angles, magnitudes) for each half year; cleared when the wind changes
 grid_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
 current_year = 0.0
 current_half_year = 0
@@ -80,6 +158,10 @@ death_num = 0
 tree_percentage = 0.0
 selected_tile = None
 simulation_active = False
+# Viewport: the tile at the window's top-left corner and the zoom relative to fitting the whole grid
+view_x = 0.0
+view_y = 0.0
+view_zoom = 1.0
 
 # --- Soil Initialization ---
 def initialize_soil_conditions():
@@ -114,6 +196,149 @@ def initialize_soil_conditions():
             x = max(0, min(WIDTH_TILES - 1, x))
             y += random.randint(1, 2)
 
+# --- Soil Raster Loading ---
+class TiledRaster:
+    # A raster stored as a directory of .npy chunks named r{row}_c{col}.npy.
+    # Chunks are memory-mapped the first time a slice touches them.
+    def __init__(self, path):
+        self.path = path
+        self.chunks = {}
+        max_row = max_col = 0
+        for name in os.listdir(path):
+            if name.startswith('r') and name.endswith('.npy') and '_c' in name:
+                row, col = name[1:-4].split('_c')
+                max_row = max(max_row, int(row))
+                max_col = max(max_col, int(col))
+
+        first = self.get_chunk(0, 0)
+        self.chunk_rows, self.chunk_cols = first.shape
+        self.dtype = first.dtype
+        rows = max_row * self.chunk_rows + self.get_chunk(max_row, 0).shape[0]
+        cols = max_col * self.chunk_cols + self.get_chunk(0, max_col).shape[1]
+        self.shape = (rows, cols)
+
+    def get_chunk(self, row, col):
+        if (row, col) not in self.chunks:
+            chunk_path = os.path.join(self.path, f"r{row}_c{col}.npy")
+            self.chunks[(row, col)] = np.load(chunk_path, mmap_mode='r')
+        return self.chunks[(row, col)]
+
+    def __getitem__(self, key):
+        row_slice, col_slice = key
+        r0, r1, _ = row_slice.indices(self.shape[0])
+        c0, c1, _ = col_slice.indices(self.shape[1])
+        out = np.empty((r1 - r0, c1 - c0), dtype=self.dtype)
+
+        for chunk_row in range(r0 // self.chunk_rows, (r1 - 1) // self.chunk_rows + 1):
+            for chunk_col in range(c0 // self.chunk_cols, (c1 - 1) // self.chunk_cols + 1):
+                # Overlap of the requested window with this chunk, in raster coordinates
+                cr0 = max(r0, chunk_row * self.chunk_rows)
+                cr1 = min(r1, (chunk_row + 1) * self.chunk_rows)
+                cc0 = max(c0, chunk_col * self.chunk_cols)
+                cc1 = min(c1, (chunk_col + 1) * self.chunk_cols)
+                chunk = self.get_chunk(chunk_row, chunk_col)
+                out[cr0 - r0:cr1 - r0, cc0 - c0:cc1 - c0] = chunk[
+                    cr0 - chunk_row * self.chunk_rows:cr1 - chunk_row * self.chunk_rows,
+                    cc0 - chunk_col * self.chunk_cols:cc1 - chunk_col * self.chunk_cols]
+        return out
+
+def open_soil_raster(path):
+    # Opens a raster without reading it; pages are only touched when sliced
+    if os.path.isdir(path):
+        return TiledRaster(path)
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    if SOIL_RASTER_SHAPE is None:
+        raise ValueError(f"SOIL_RASTER_SHAPE must be set to read raw raster {path}")
+    return np.memmap(path, dtype=SOIL_RASTER_DTYPE, mode='r', shape=SOIL_RASTER_SHAPE)
+
+def load_soil_rasters():
+    global soil_sources, soil_block_loaded
+    for name, path in (("SOIL_MOISTURE_RASTER", SOIL_MOISTURE_RASTER), ("SOIL_NUTRIENT_RASTER", SOIL_NUTRIENT_RASTER)):
+        if path is None:
+            raise ValueError(f"{name} must be set when loading soil from rasters")
+    soil_sources = (open_soil_raster(SOIL_MOISTURE_RASTER), open_soil_raster(SOIL_NUTRIENT_RASTER))
+    if soil_sources[0].shape != soil_sources[1].shape:
+        raise ValueError(f"Soil rasters differ in shape: {soil_sources[0].shape} vs {soil_sources[1].shape}")
+
+    soil_moisture.fill(0.0)
+    soil_nutrients.fill(0.0)
+    blocks_x = (WIDTH_TILES + SOIL_BLOCK_TILES - 1) // SOIL_BLOCK_TILES
+    blocks_y = (HEIGHT_TILES + SOIL_BLOCK_TILES - 1) // SOIL_BLOCK_TILES
+    soil_block_loaded = np.zeros((blocks_x, blocks_y), dtype=bool)
+
+def resample_raster_block(raster, x0, x1, y0, y1):
+    # Area-average the raster cells covering tiles [x0, x1) x [y0, y1).
+    # When the raster is coarser than the grid, each tile takes the nearest cell instead.
+    rows, cols = raster.shape
+    row_edges = (np.arange(y0, y1 + 1) * rows) // HEIGHT_TILES
+    col_edges = (np.arange(x0, x1 + 1) * cols) // WIDTH_TILES
+    r0, r1 = row_edges[0], max(row_edges[-1], row_edges[-2] + 1)
+    c0, c1 = col_edges[0], max(col_edges[-1], col_edges[-2] + 1)
+
+    window = np.asarray(raster[r0:r1, c0:c1], dtype=np.float64)
+    window = np.nan_to_num(window)
+    sums = np.add.reduceat(np.add.reduceat(window, row_edges[:-1] - r0, axis=0), col_edges[:-1] - c0, axis=1)
+    counts = np.outer(np.maximum(np.diff(row_edges), 1), np.maximum(np.diff(col_edges), 1))
+    # Raster is (row, col) = (y, x); the grid is indexed [x][y]
+    return (sums / counts).T
+
+def fault_in_soil(x, y):
+    # Reads the soil block containing tile (x, y) from the rasters if it hasn't been already
+    if soil_sources is None:
+        return
+    bx, by = x // SOIL_BLOCK_TILES, y // SOIL_BLOCK_TILES
+    if soil_block_loaded[bx, by]:
+        return
+
+    x0, y0 = bx * SOIL_BLOCK_TILES, by * SOIL_BLOCK_TILES
+    x1, y1 = min(WIDTH_TILES, x0 + SOIL_BLOCK_TILES), min(HEIGHT_TILES, y0 + SOIL_BLOCK_TILES)
+    soil_moisture[x0:x1, y0:y1] = np.clip(resample_raster_block(soil_sources[0], x0, x1, y0, y1), 0.0, 1.0)
+    soil_nutrients[x0:x1, y0:y1] = np.clip(resample_raster_block(soil_sources[1], x0, x1, y0, y1), 0.0, 1.0)
+    soil_block_loaded[bx, by] = True
+    mark_grid_changed()
+
+def soil_loaded_mask():
+    # Per-tile version of soil_block_loaded, or None when soil isn't from rasters
+    if soil_sources is None:
+        return None
+    loaded = np.repeat(np.repeat(soil_block_loaded, SOIL_BLOCK_TILES, axis=0), SOIL_BLOCK_TILES, axis=1)
+    return loaded[:WIDTH_TILES, :HEIGHT_TILES]
+
+# --- Wind Field ---
+def load_wind_field():
+    # Opens the wind raster without reading it; blocks are resampled as dispersal reaches them
+    global wind_field
+    wind_field = np.load(WIND_FIELD, mmap_mode='r') if WIND_FIELD is not None else None
+    wind_blocks.clear()
+
+def build_wind_block(bx, by):
+    # Direction and strength of the wind on each tile of a SOIL_BLOCK_TILES block for both
+    # half years, as plain lists so dispersal is a lookup instead of an atan2 / sqrt per seed
+    x0, y0 = bx * SOIL_BLOCK_TILES, by * SOIL_BLOCK_TILES
+    x1, y1 = min(WIDTH_TILES, x0 + SOIL_BLOCK_TILES), min(HEIGHT_TILES, y0 + SOIL_BLOCK_TILES)
+    if wind_field is None:
+        wind_x = np.full((x1 - x0, y1 - y0), float(WIND_VECTOR[0]))
+        wind_y = np.full((x1 - x0, y1 - y0), float(WIND_VECTOR[1]))
+    else:
+        wind_x = resample_raster_block(wind_field[:, :, 0], x0, x1, y0, y1)
+        wind_y = resample_raster_block(wind_field[:, :, 1], x0, x1, y0, y1)
+    angle = np.degrees(np.arctan2(wind_y, wind_x))
+    magnitude = np.hypot(wind_x, wind_y)
+    angles = [angle.tolist(), (angle + WIND_SEASONAL_ROTATION).tolist()]
+    magnitudes = [magnitude.tolist(), (magnitude * WIND_SEASONAL_STRENGTH).tolist()]
+    return angles, magnitudes
+
+def wind_at(x, y):
+    # Returns the (angle in degrees, magnitude) of the wind on a tile this half year
+    bx, i = divmod(x, SOIL_BLOCK_TILES)
+    by, j = divmod(y, SOIL_BLOCK_TILES)
+    block = wind_blocks.get((bx, by))
+    if block is None:
+        block = wind_blocks[(bx, by)] = build_wind_block(bx, by)
+    angles, magnitudes = block
+    return angles[current_half_year][i][j], magnitudes[current_half_year][i][j]
+
 # --- Dispersal Helper Functions ---
 def get_coordinates(direction_degrees, magnitude):
     # Convert polar coordinates (angle in degrees, magnitude) to Cartesian (dx, dy)
@@ -134,12 +359,11 @@ def get_animal_displacement(x, y):
     return get_coordinates(direction, magnitude)
 
 def get_wind_displacement(x, y):
-    # Wind dispersal: direction is centered on wind vector, with random spread
-    base_wind_angle = math.degrees(math.atan2(WIND_VECTOR[1], WIND_VECTOR[0]))
+    # Wind dispersal: direction is centered on the local wind, with random spread
+    base_wind_angle, base_magnitude = wind_at(x, y)
     direction = random.normalvariate(base_wind_angle, WIND_DIRECTION_STD_DEV) % 360
 
     # Magnitude is based on wind strength, with random variation
-    base_magnitude = math.sqrt(WIND_VECTOR[0]**2 + WIND_VECTOR[1]**2)
     magnitude_variation = random.uniform(1.0 - WIND_DISTANCE_VARIATION/2 , 1.0 + WIND_DISTANCE_VARIATION/2)
     magnitude = (base_magnitude * SEED_WIND_MAGNITUDE_FACTOR *
                  WIND_BASE_DISTANCE_MULT * magnitude_variation)
@@ -159,8 +383,6 @@ class Tile:
     def __init__(self):
         self.has_tree = False
         self.tree_age = 0.0
-        self.has_seed = False
-        self.seed_timer = 0.0
         self.next_mast_year = random.uniform(MAST_FREQUENCY_MIN, MAST_FREQUENCY_MAX)
         self.years_since_last_mast = 0.0
         self.is_mast_year = False
@@ -185,11 +407,14 @@ class Tile:
                 global death_num
                 self.has_tree = False
                 self.tree_age = 0.0
-                self.has_seed = False
-                self.seed_timer = 0.0
                 self.years_since_last_mast = 0.0
                 self.is_mast_year = False
+                tree_mask[x, y] = False
+                tree_birth_step[x, y] = -1
+                died_mask[x, y] = True
                 death_num += 1
+                if record_file is not None:
+                    pending_events.append((EVENT_DIED, [x * HEIGHT_TILES + y], [1]))
                 return
 
             self.years_since_last_mast += YEARS_PER_UPDATE
@@ -209,43 +434,6 @@ class Tile:
                     seed_count = random.randint(5, 10)
                 self.disperse_seeds(x, y, seed_count)
 
-        elif self.has_seed:
-            self.seed_timer += YEARS_PER_UPDATE
-
-            moisture = soil_moisture[x][y]
-            nutrients = soil_nutrients[x][y]
-            MAX_MOISTURE_FOR_GERMINATION = 0.85
-            if moisture <= MAX_MOISTURE_FOR_GERMINATION:
-                # Germination chance increases with soil moisture and nutrients
-                growth_chance = GROWTH_PROBABILITY * math.sqrt(moisture) * math.sqrt(nutrients)
-
-                if self.seed_timer >= 5 and random.random() < growth_chance:
-                    # Competition: more neighbors = lower chance to establish
-                    neighbor_trees = 0
-                    for dx in range(-1, 2):
-                        for dy in range(-1, 2):
-                            if dx == 0 and dy == 0:
-                                continue
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < WIDTH_TILES and 0 <= ny < HEIGHT_TILES:
-                                if grid[nx][ny].has_tree:
-                                    neighbor_trees += 1
-                    competition_factor = 1.0 - (neighbor_trees / 8.0) * 0.5
-
-                    if random.random() < competition_factor:
-                        self.has_tree = True
-                        self.has_seed = False
-                        self.tree_age = 0.0
-                        self.seed_timer = 0.0
-                        self.next_mast_year = random.uniform(MAST_FREQUENCY_MIN, MAST_FREQUENCY_MAX)
-                        self.years_since_last_mast = 0.0
-                        self.is_mast_year = False
-
-            if self.seed_timer > 30:
-                # Seeds expire after 30 years if not germinated
-                self.has_seed = False
-                self.seed_timer = 0.0
-
     def disperse_seeds(self, x, y, seed_count):
         for _ in range(seed_count):
             # Most seeds dispersed by animals, some by wind
@@ -259,41 +447,139 @@ class Tile:
             new_y = int(round(y + dy))
 
             if 0 <= new_x < WIDTH_TILES and 0 <= new_y < HEIGHT_TILES:
-                target_tile = grid[new_x][new_y]
-                if not target_tile.has_tree and not target_tile.has_seed:
-                    target_tile.has_seed = True
-                    target_tile.seed_timer = 0.0
+                # Seeds under a tree are banked too and can germinate if it dies before they expire
+                add_seed(new_x, new_y)
+
+# --- Seed Bank ---
+def add_seed(x, y):
+    slot = seed_step % SEED_COHORTS
+    if seed_bank[slot, x, y] < 255:
+        seed_bank[slot, x, y] += 1
+        seed_counts[x, y] += 1
+        if record_file is not None:
+            pending_landings.append(x * HEIGHT_TILES + y)
+    fault_in_soil(x, y)
+
+def seed_age_range(x, y):
+    # Returns (youngest, oldest) seed age in years on a tile, or None if it has no seeds
+    ages = [age for age in range(SEED_COHORTS) if seed_bank[(seed_step - age) % SEED_COHORTS, x, y]]
+    if not ages:
+        return None
+    return ages[0] * YEARS_PER_UPDATE, ages[-1] * YEARS_PER_UPDATE
+
+def age_seed_bank():
+    # Advancing the ring moves every cohort up a half year; the slot it lands on
+    # holds the cohort that just passed SEED_EXPIRY_YEARS.
+    global seed_step, seed_counts
+    seed_step += 1
+    expiring = seed_bank[seed_step % SEED_COHORTS]
+    if record_file is not None:
+        tiles = np.flatnonzero(expiring)
+        pending_events.append((EVENT_SEED_EXPIRED, tiles, expiring.ravel()[tiles]))
+    seed_counts -= expiring
+    expiring.fill(0)
+
+def germinate_seed_bank():
+    # Each dormant-expired seed on an empty tile germinates independently with the
+    # soil / competition adjusted chance; a tile establishes if any of its seeds do.
+    young_slots = [(seed_step - age) % SEED_COHORTS for age in range(SEED_DORMANCY_STEPS)]
+    eligible = seed_counts - seed_bank[young_slots].sum(axis=0, dtype=np.int32)
+    eligible[tree_mask] = 0
+    eligible[soil_moisture > MAX_MOISTURE_FOR_GERMINATION] = 0
+    xs, ys = np.nonzero(eligible)
+    if len(xs) == 0:
+        return
+
+    # Competition: more neighbors = lower chance to establish
+    padded = np.pad(tree_mask, 1).astype(np.int8)
+    neighbor_trees = (padded[:-2, :-2] + padded[:-2, 1:-1] + padded[:-2, 2:] +
+                      padded[1:-1, :-2] + padded[1:-1, 2:] +
+                      padded[2:, :-2] + padded[2:, 1:-1] + padded[2:, 2:])
+    competition_factor = 1.0 - (neighbor_trees[xs, ys] / 8.0) * 0.5
+
+    # Germination chance increases with soil moisture and nutrients
+    growth_chance = GROWTH_PROBABILITY * np.sqrt(soil_moisture[xs, ys]) * np.sqrt(soil_nutrients[xs, ys])
+    germinated = np.random.binomial(eligible[xs, ys], growth_chance * competition_factor) > 0
+
+    for x, y in zip(xs[germinated], ys[germinated]):
+        tile = grid[x][y]
+        tile.has_tree = True
+        tile.tree_age = 0.0
+        tile.next_mast_year = random.uniform(MAST_FREQUENCY_MIN, MAST_FREQUENCY_MAX)
+        tile.years_since_last_mast = 0.0
+        tile.is_mast_year = False
+    if record_file is not None:
+        tiles = xs[germinated] * HEIGHT_TILES + ys[germinated]
+        pending_events.append((EVENT_GERMINATED, tiles, np.ones(len(tiles))))
+    # The seedling outcompetes the rest of the tile's bank
+    tree_mask[xs[germinated], ys[germinated]] = True
+    tree_birth_step[xs[germinated], ys[germinated]] = seed_step
+    seed_bank[:, xs[germinated], ys[germinated]] = 0
+    seed_counts[xs[germinated], ys[germinated]] = 0
 
 # --- Grid Initialization ---
 grid = [[Tile() for y in range(HEIGHT_TILES)] for x in range(WIDTH_TILES)]
 
 # --- Helper Functions ---
+def mark_grid_changed():
+    global grid_version
+    grid_version += 1
+
 def place_initial_seed(x, y):
     if 0 <= x < WIDTH_TILES and 0 <= y < HEIGHT_TILES:
-        tile = grid[x][y]
-        if not tile.has_tree and not tile.has_seed:
-            tile.has_seed = True
-            tile.seed_timer = 0.0
+        if not grid[x][y].has_tree and not seed_counts[x, y]:
+            add_seed(x, y)
+            mark_grid_changed()
             return True
     return False
 
 def count_trees():
     global tree_count, tree_percentage
-    count = 0
-    for x in range(WIDTH_TILES):
-        for y in range(HEIGHT_TILES):
-            if grid[x][y].has_tree:
-                count += 1
-
-    tree_count = count
+    tree_count = int(np.count_nonzero(tree_mask))
     total_tiles = WIDTH_TILES * HEIGHT_TILES
-    tree_percentage = (count / total_tiles) * 100 if total_tiles > 0 else 0.0
+    tree_percentage = (tree_count / total_tiles) * 100 if total_tiles > 0 else 0.0
+
+def diffuse_soil(field, active):
+    # Exchanges resources between 4-neighbours; edges are closed so the total is conserved.
+    # Pairs where either tile is inactive (soil not yet loaded) don't exchange.
+    flux_x = SOIL_DIFFUSION_RATE * (field[1:, :] - field[:-1, :])
+    flux_y = SOIL_DIFFUSION_RATE * (field[:, 1:] - field[:, :-1])
+    if active is not None:
+        flux_x *= active[1:, :] & active[:-1, :]
+        flux_y *= active[:, 1:] & active[:, :-1]
+    field[:-1, :] += flux_x
+    field[1:, :] -= flux_x
+    field[:, :-1] += flux_y
+    field[:, 1:] -= flux_y
+
+def update_soil():
+    # Living trees draw resources, dead trees return them, then everything spreads sideways.
+    # Fields are updated in place so lifecycle() sees the new values next step.
+    soil_moisture[tree_mask] -= WATER_CONSUMPTION_RATE * YEARS_PER_UPDATE
+    soil_nutrients[tree_mask] -= NUTRIENT_CONSUMPTION_RATE * YEARS_PER_UPDATE
+    soil_moisture[died_mask] += WATER_RETURN_RATE
+    soil_nutrients[died_mask] += NUTRIENT_RETURN_RATE
+    died_mask.fill(False)
+
+    active = soil_loaded_mask()
+    diffuse_soil(soil_moisture, active)
+    diffuse_soil(soil_nutrients, active)
+
+    np.clip(soil_moisture, 0.0, 1.0, out=soil_moisture)
+    np.clip(soil_nutrients, 0.0, 1.0, out=soil_nutrients)
 
 def update_simulation():
     global current_year, current_half_year
+    if record_file is not None:
+        # Seeds placed by hand since the last step belong to the current keyframe
+        flush_events()
+        if seed_step % int(KEYFRAME_YEARS / YEARS_PER_UPDATE) == 0:
+            write_keyframe()
+
     current_year += YEARS_PER_UPDATE
 
     current_half_year = 1 - current_half_year
+    age_seed_bank()
 
     tile_indices = [(x, y) for x in range(WIDTH_TILES) for y in range(HEIGHT_TILES)]
     random.shuffle(tile_indices)
@@ -301,7 +587,121 @@ def update_simulation():
     for x, y in tile_indices:
         grid[x][y].lifecycle(x, y)
 
+    germinate_seed_bank()
+    update_soil()
     count_trees()
+    mark_grid_changed()
+
+    if record_file is not None:
+        flush_events()
+
+# --- Event Recording ---
+def start_recording():
+    global record_file
+    stop_recording()
+    os.makedirs(RECORD_PATH, exist_ok=True)
+    for name in os.listdir(RECORD_PATH):
+        if name.startswith('keyframe_'):
+            os.remove(os.path.join(RECORD_PATH, name))
+    with open(os.path.join(RECORD_PATH, 'meta.json'), 'w') as f:
+        json.dump({'width': WIDTH_TILES, 'height': HEIGHT_TILES, 'years_per_update': YEARS_PER_UPDATE}, f)
+    record_file = open(os.path.join(RECORD_PATH, 'events.bin'), 'wb')
+    pending_landings.clear()
+    pending_events.clear()
+
+def stop_recording():
+    global record_file
+    if record_file is not None:
+        flush_events()
+        record_file.close()
+        record_file = None
+
+def flush_events():
+    # Writes everything since the last flush as events of the current step. Landings are
+    # merged per tile; the order expired, died, landed, germinated matches the step itself.
+    if pending_landings:
+        tiles, counts = np.unique(pending_landings, return_counts=True)
+        landed = (EVENT_SEED_LANDED, tiles, counts)
+        germinated = [event for event in pending_events if event[0] == EVENT_GERMINATED]
+        others = [event for event in pending_events if event[0] != EVENT_GERMINATED]
+        pending_events[:] = others + [landed] + germinated
+    for kind, tiles, counts in pending_events:
+        records = np.empty(len(tiles), dtype=EVENT_DTYPE)
+        records['step'] = seed_step
+        records['kind'] = kind
+        records['tile'] = tiles
+        records['count'] = counts
+        records.tofile(record_file)
+    record_file.flush()
+    pending_landings.clear()
+    pending_events.clear()
+
+def write_keyframe():
+    np.savez_compressed(os.path.join(RECORD_PATH, f"keyframe_{seed_step:08d}.npz"),
+                        birth_step=tree_birth_step,
+                        seeds=seed_counts.astype(np.uint16),
+                        soil_moisture=soil_moisture.astype(np.float16),
+                        soil_nutrients=soil_nutrients.astype(np.float16))
+
+# --- Replay ---
+class ReplayLog:
+    # Reconstructs a recorded run at any step from the nearest earlier keyframe plus the
+    # events after it, without running any of the model.
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.path = path
+        self.keyframe_steps = sorted(int(name[9:17]) for name in os.listdir(path) if name.startswith('keyframe_'))
+        if not self.keyframe_steps:
+            raise ValueError(f"No keyframes recorded in {path}")
+        events_path = os.path.join(path, 'events.bin')
+        if os.path.getsize(events_path) >= EVENT_DTYPE.itemsize:
+            self.events = np.memmap(events_path, dtype=EVENT_DTYPE, mode='r')
+        else:
+            self.events = np.zeros(0, dtype=EVENT_DTYPE)
+        self.event_steps = np.asarray(self.events['step'])
+        self.last_step = max(self.keyframe_steps[-1], int(self.event_steps[-1]) if len(self.events) else 0)
+        self.cached_keyframe = (None, None)
+
+    def load_keyframe(self, step):
+        if self.cached_keyframe[0] != step:
+            with np.load(os.path.join(self.path, f"keyframe_{step:08d}.npz")) as data:
+                self.cached_keyframe = (step, {name: data[name] for name in data.files})
+        return self.cached_keyframe[1]
+
+    def state_at(self, step):
+        # Returns (birth_step, seeds, soil_moisture, soil_nutrients) after the given step
+        keyframe_step = self.keyframe_steps[max(0, np.searchsorted(self.keyframe_steps, step, 'right') - 1)]
+        keyframe = self.load_keyframe(keyframe_step)
+        birth_step = keyframe['birth_step'].ravel().copy()
+        seeds = keyframe['seeds'].ravel().astype(np.int32)
+
+        lo = np.searchsorted(self.event_steps, keyframe_step, 'right')
+        hi = np.searchsorted(self.event_steps, step, 'right')
+        events = np.asarray(self.events[lo:hi])
+        order = np.arange(len(events))
+        kind, tile = events['kind'], events['tile']
+
+        # Trees: the last germination / death on a tile decides it
+        is_tree_event = (kind == EVENT_GERMINATED) | (kind == EVENT_DIED)
+        last_tree_event = np.full(len(birth_step), -1)
+        np.maximum.at(last_tree_event, tile[is_tree_event], order[is_tree_event])
+        changed = np.flatnonzero(last_tree_event >= 0)
+        last = events[last_tree_event[changed]]
+        birth_step[changed] = np.where(last['kind'] == EVENT_GERMINATED, last['step'], -1)
+
+        # Seeds: germination empties a tile's bank, so only count what happened after it
+        is_germination = kind == EVENT_GERMINATED
+        last_germination = np.full(len(seeds), -1)
+        np.maximum.at(last_germination, tile[is_germination], order[is_germination])
+        seeds[last_germination >= 0] = 0
+        is_seed_event = ((kind == EVENT_SEED_LANDED) | (kind == EVENT_SEED_EXPIRED)) & (order > last_germination[tile])
+        delta = np.where(kind == EVENT_SEED_LANDED, 1, -1) * events['count'].astype(np.int32)
+        seeds += np.bincount(tile[is_seed_event], delta[is_seed_event], len(seeds)).astype(np.int32)
+
+        shape = (self.meta['width'], self.meta['height'])
+        return (birth_step.reshape(shape), seeds.reshape(shape),
+                keyframe['soil_moisture'].astype(np.float64), keyframe['soil_nutrients'].astype(np.float64))
 
 # --- Drawing Functions ---
 def draw_stats_panel():
@@ -334,42 +734,234 @@ def draw_stats_panel():
 
     window.blit(panel, (panel_x, panel_y))
 
-def draw_grid():
+# --- Viewport ---
+def tile_pixels():
+    return sq_width * view_zoom, sq_height * view_zoom
+
+def screen_to_tile(px, py):
+    tile_w, tile_h = tile_pixels()
+    return int(view_x + px / tile_w), int(view_y + py / tile_h)
+
+def clamp_view():
+    global view_x, view_y
+    tile_w, tile_h = tile_pixels()
+    view_x = max(0.0, min(WIDTH_TILES - WINDOW_WIDTH / tile_w, view_x))
+    view_y = max(0.0, min(HEIGHT_TILES - WINDOW_HEIGHT / tile_h, view_y))
+
+def zoom_view(factor, px, py):
+    # Zooms about the pixel (px, py) so the tile under it stays put
+    global view_x, view_y, view_zoom
+    tile_w, tile_h = tile_pixels()
+    focus_x, focus_y = view_x + px / tile_w, view_y + py / tile_h
+    max_zoom = max(1.0, MAX_TILE_PIXELS / min(sq_width, sq_height))
+    view_zoom = max(1.0, min(max_zoom, view_zoom * factor))
+    tile_w, tile_h = tile_pixels()
+    view_x, view_y = focus_x - px / tile_w, focus_y - py / tile_h
+    clamp_view()
+
+def pan_view(dx, dy):
+    global view_x, view_y
+    tile_w, tile_h = tile_pixels()
+    view_x -= dx / tile_w
+    view_y -= dy / tile_h
+    clamp_view()
+
+def reset_view():
+    global view_x, view_y, view_zoom
+    view_x, view_y, view_zoom = 0.0, 0.0, 1.0
+
+def handle_view_event(event):
+    # Mouse wheel / +,- zoom, middle-drag pans, 0 resets. Returns True if the event was used.
+    if event.type == pygame.MOUSEWHEEL:
+        zoom_view(ZOOM_STEP ** event.y, *pygame.mouse.get_pos())
+    elif event.type == pygame.MOUSEMOTION and event.buttons[1]:
+        pan_view(*event.rel)
+    elif event.type == pygame.KEYDOWN and event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+        zoom_view(ZOOM_STEP, WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+    elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+        zoom_view(1 / ZOOM_STEP, WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+    elif event.type == pygame.KEYDOWN and event.key == pygame.K_0:
+        reset_view()
+    else:
+        return False
+    return True
+
+# --- Tile Rendering ---
+def heatmap_block():
+    # Tiles per side of one heatmap block, or 0 when tiles are big enough to draw individually.
+    # Blocks are the power of two nearest one pixel, so they line up with density_pyramid levels.
+    tile_w, tile_h = tile_pixels()
+    if min(tile_w, tile_h) >= LOD_MIN_TILE_PIXELS:
+        return 0
+    level = max(0, round(math.log2(1 / min(tile_w, tile_h))))
+    top_level = max(1, math.ceil(math.log2(min(WIDTH_TILES, HEIGHT_TILES))))
+    return 2 ** min(level, top_level)
+
+def visible_region():
+    # Slices of the grid on screen. Heatmap blocks are aligned to the grid rather than the view
+    # so the image doesn't shimmer while panning.
+    tile_w, tile_h = tile_pixels()
+    x0, y0 = int(view_x), int(view_y)
+    x1 = min(WIDTH_TILES, int(math.ceil(view_x + WINDOW_WIDTH / tile_w)))
+    y1 = min(HEIGHT_TILES, int(math.ceil(view_y + WINDOW_HEIGHT / tile_h)))
+    block = heatmap_block()
+    if block:
+        x0, y0 = x0 - x0 % block, y0 - y0 % block
+    return slice(x0, x1), slice(y0, y1)
+
+def tile_ages(birth_step, step, years_per_update):
+    # Each tree's age in years, negative where there is no tree
+    return np.where(birth_step >= 0, (step - birth_step) * years_per_update, -1.0)
+
+def tile_loaded(loaded_blocks, region):
+    # Per-tile view of soil_block_loaded over region, or None when soil isn't from rasters
+    if loaded_blocks is None:
+        return None
+    blocks_x = np.arange(region[0].start, region[0].stop) // SOIL_BLOCK_TILES
+    blocks_y = np.arange(region[1].start, region[1].stop) // SOIL_BLOCK_TILES
+    return loaded_blocks[np.ix_(blocks_x, blocks_y)]
+
+def draw_tiles(version, step, years_per_update, birth_step, seeds, moisture, nutrients, loaded_blocks=None):
+    # Draws soil, trees and seeds on the visible part of the grid so live runs and replays share
+    # it. The arrays cover the whole grid; version changes whenever their contents do.
     grid_surface.fill((0, 0, 0))
+    region = visible_region()
+    if heatmap_block():
+        draw_density_map(region, version, step, years_per_update, birth_step, seeds, moisture, nutrients, loaded_blocks)
+    else:
+        draw_tile_detail(region, tile_ages(birth_step[region], step, years_per_update),
+                         seeds[region], moisture[region], nutrients[region], tile_loaded(loaded_blocks, region))
 
-    tree_circle_radius = int(min(sq_width, sq_height) / 2 * 0.8)
+def draw_tile_detail(region, ages, seeds, moisture, nutrients, loaded):
+    # One rect and circle per visible tile; only used when tiles are big enough to see
+    tile_w, tile_h = tile_pixels()
+    tree_circle_radius = int(min(tile_w, tile_h) / 2 * 0.8)
     seed_circle_radius = max(1, int(tree_circle_radius * 0.4))
 
     normal_tree_color = (100, 255, 100)
-    seed_color = (200, 200, 0)
-    highlight_color = (255, 255, 255)
 
-    for x in range(WIDTH_TILES):
-        for y in range(HEIGHT_TILES):
-            px = int(x * sq_width)
-            py = int(y * sq_height)
-            tile_rect = pygame.Rect(px, py, int(sq_width) + 1, int(sq_height) + 1)
-            center_x = int(px + sq_width / 2)
-            center_y = int(py + sq_height / 2)
+    for i in range(ages.shape[0]):
+        for j in range(ages.shape[1]):
+            px = int((region[0].start + i - view_x) * tile_w)
+            py = int((region[1].start + j - view_y) * tile_h)
+            tile_rect = pygame.Rect(px, py, int(tile_w) + 1, int(tile_h) + 1)
+            center_x = int(px + tile_w / 2)
+            center_y = int(py + tile_h / 2)
 
-            tile_state = grid[x][y]
-
-            soil_color = color_by_soil(soil_moisture[x][y], soil_nutrients[x][y])
+            if loaded is None or loaded[i, j]:
+                soil_color = color_by_soil(moisture[i][j], nutrients[i][j])
+            else:
+                soil_color = UNLOADED_SOIL_COLOR
             pygame.draw.rect(grid_surface, soil_color, tile_rect)
 
-            if tile_state.has_tree:
+            if ages[i, j] >= 0:
                 tree_color = normal_tree_color
                 pygame.draw.circle(grid_surface, tree_color, (center_x, center_y), tree_circle_radius)
 
-            elif tile_state.has_seed:
-                pygame.draw.circle(grid_surface, seed_color, (center_x, center_y), seed_circle_radius)
+            elif seeds[i, j]:
+                pygame.draw.circle(grid_surface, SEED_COLOR, (center_x, center_y), seed_circle_radius)
+
+def block_sum(field, block):
+    # Sums block x block squares; ragged blocks at the grid edge are padded with zeros
+    if block == 1:
+        return field
+    pad_x, pad_y = -field.shape[0] % block, -field.shape[1] % block
+    if pad_x or pad_y:
+        field = np.pad(field, ((0, pad_x), (0, pad_y)))
+    # Adding strided slices is much faster than reshape(...).sum() for small blocks
+    rows = sum(field[i::block] for i in range(block))
+    return sum(rows[:, j::block] for j in range(block))
+
+def heatmap_channels(region, birth_step, seeds, moisture, nutrients, loaded_blocks):
+    # Yields the per-tile quantities the heatmap sums, one at a time to keep temporaries small:
+    # tiles, trees, tree birth step, tiles with seeds, moisture, nutrients and tiles with soil loaded
+    births = birth_step[region]
+    trees = births >= 0
+    ones = np.ones(trees.shape, dtype=np.float32)
+    yield ones
+    yield trees.astype(np.float32)
+    yield np.where(trees, births, 0).astype(np.float32)
+    yield (seeds[region] > 0).astype(np.float32)
+    yield moisture[region].astype(np.float32)
+    yield nutrients[region].astype(np.float32)
+    loaded = tile_loaded(loaded_blocks, region)
+    yield ones if loaded is None else loaded.astype(np.float32)
+
+def build_density_pyramid(version, birth_step, seeds, moisture, nutrients, loaded_blocks):
+    # Level k holds each of heatmap_channels summed over 2**k x 2**k blocks of tiles. Soil changes on
+    # every tile each step, so the pyramid is rebuilt whenever the grid changes, once for
+    # however many redraws follow; panning and zooming then only read the visible blocks.
+    global density_pyramid
+    everything = (slice(0, birth_step.shape[0]), slice(0, birth_step.shape[1]))
+    channels = heatmap_channels(everything, birth_step, seeds, moisture, nutrients, loaded_blocks)
+    levels = [[block_sum(channel, 2) for channel in channels]]
+    while min(levels[-1][0].shape) > 1:
+        levels.append([block_sum(channel, 2) for channel in levels[-1]])
+    density_pyramid = (version, levels)
+
+def draw_density_map(region, version, step, years_per_update, birth_step, seeds, moisture, nutrients, loaded_blocks):
+    # Colours each block of roughly one pixel by soil, tree density and mean tree age, then
+    # scales the image onto the window. Blocks of one tile are read straight from the grid,
+    # larger ones from density_pyramid, so the cost follows the window size, not the grid's.
+    tile_w, tile_h = tile_pixels()
+    block = heatmap_block()
+    if block == 1:
+        sums = heatmap_channels(region, birth_step, seeds, moisture, nutrients, loaded_blocks)
+    else:
+        if density_pyramid[0] != version:
+            build_density_pyramid(version, birth_step, seeds, moisture, nutrients, loaded_blocks)
+        blocks = (slice(region[0].start // block, -(-region[0].stop // block)),
+                  slice(region[1].start // block, -(-region[1].stop // block)))
+        sums = [channel[blocks] for channel in density_pyramid[1][int(math.log2(block)) - 1]]
+    area, tree_count, birth_sum, seeded, moisture_sum, nutrient_sum, loaded_count = sums
+
+    density = tree_count / area
+    mean_age = (step - birth_sum / np.maximum(tree_count, 1)) * years_per_update
+    maturity = np.clip(mean_age / SENESCENCE_MIDPOINT, 0.0, 1.0)
+    seed_weight = 0.5 * (seeded / area) * (1 - density)
+    soil_weight = 1 - density - seed_weight
+    block_moisture = moisture_sum / area
+    block_nutrients = nutrient_sum / area
+    unloaded = None if loaded_blocks is None else loaded_count == 0
+
+    # Blend soil, tree and seed colours one channel at a time to keep temporaries small.
+    # Soil uses the same formula as color_by_soil.
+    soil_formula = [(150, -60, -20), (80, -20, 100), (40, 60, -20)]
+    rgb = np.empty(density.shape + (3,), dtype=np.uint8)
+    for channel, (base, moisture_factor, nutrient_factor) in enumerate(soil_formula):
+        soil = np.clip(base + block_moisture * moisture_factor + block_nutrients * nutrient_factor, 0, 255)
+        if unloaded is not None:
+            soil[unloaded] = UNLOADED_SOIL_COLOR[channel]
+        young, old = YOUNG_TREE_COLOR[channel], OLD_TREE_COLOR[channel]
+        tree = young + (old - young) * maturity
+        rgb[..., channel] = soil * soil_weight + tree * density + SEED_COLOR[channel] * seed_weight
+
+    image = pygame.surfarray.make_surface(rgb)
+    tiles_x = region[0].stop - region[0].start
+    tiles_y = region[1].stop - region[1].start
+    size = (int(math.ceil(tiles_x * tile_w)), int(math.ceil(tiles_y * tile_h)))
+    position = ((region[0].start - view_x) * tile_w, (region[1].start - view_y) * tile_h)
+    grid_surface.blit(pygame.transform.scale(image, size), position)
 
-            if selected_tile == (x, y):
-                highlight_rect = pygame.Rect(px, py, int(sq_width), int(sq_height))
-                pygame.draw.rect(grid_surface, highlight_color, highlight_rect, 2)
+def draw_grid():
+    global drawn_frame
+    # grid_surface is only redrawn when the grid or the view has changed since last frame
+    frame = (grid_version, view_x, view_y, view_zoom)
+    if frame != drawn_frame:
+        loaded_blocks = soil_block_loaded if soil_sources is not None else None
+        draw_tiles(grid_version, seed_step, YEARS_PER_UPDATE, tree_birth_step, seed_counts,
+                   soil_moisture, soil_nutrients, loaded_blocks)
+        drawn_frame = frame
 
     window.blit(grid_surface, (0, 0))
 
+    if selected_tile:
+        highlight_color = (255, 255, 255)
+        tile_w, tile_h = tile_pixels()
+        highlight_rect = pygame.Rect(int((selected_tile[0] - view_x) * tile_w), int((selected_tile[1] - view_y) * tile_h),
+                                     max(2, int(tile_w)), max(2, int(tile_h)))
+        pygame.draw.rect(window, highlight_color, highlight_rect, 2)
+
     year_str = f"Year: {current_year:.1f}"
     migration_season = "Spring/Summer" if current_half_year == 0 else "Autumn/Winter"
     year_text = font.render(f"{year_str} ({migration_season})", True, (255, 255, 255))
@@ -389,6 +981,7 @@ def draw_grid():
     if selected_tile:
         x, y = selected_tile
         tile = grid[x][y]
+        fault_in_soil(x, y)
         info_box_width = 300
         info_box_height = 120
         info_box = pygame.Surface((info_box_width, info_box_height))
@@ -416,12 +1009,14 @@ def draw_grid():
             next_mast_text = small_font.render(f"(Next in ~{next_mast_rem:.1f} yrs)", True, (150, 150, 150))
             info_box.blit(next_mast_text, (10 + mast_text.get_width() + 5 , line_y)); line_y += line_spacing
 
-        elif tile.has_seed:
-            seed_text = small_font.render(f"Seed Age: {tile.seed_timer:.1f} years", True, (255, 255, 150))
+        elif (seed_ages := seed_age_range(x, y)):
+            youngest, oldest = seed_ages
+            seed_count = int(seed_counts[x, y])
+            seed_text = small_font.render(f"Seeds: {seed_count}, ages {youngest:.1f}-{oldest:.1f} years", True, (255, 255, 150))
             info_box.blit(seed_text, (10, line_y)); line_y += line_spacing
 
-            germ_time_rem = max(0, 5 - tile.seed_timer)
-            expiry_time_rem = max(0, 30 - tile.seed_timer)
+            germ_time_rem = max(0, SEED_DORMANCY_YEARS - oldest)
+            expiry_time_rem = max(0, SEED_EXPIRY_YEARS - oldest)
             germ_text = small_font.render(f"Germ. check in: {germ_time_rem:.1f} yrs", True, (200, 200, 200))
             info_box.blit(germ_text, (10, line_y)); line_y += line_spacing
             expiry_text = small_font.render(f"Expires in: {expiry_time_rem:.1f} yrs", True, (200, 150, 150))
@@ -442,7 +1037,10 @@ def draw_grid():
 
 # --- Wind Control ---
 def change_wind_direction(dx, dy):
-    global WIND_VECTOR
+    # Sets a uniform wind over the whole map, replacing any loaded wind field
+    global WIND_VECTOR, wind_field
+    wind_field = None
+    wind_blocks.clear()
     norm = math.sqrt(dx**2 + dy**2)
     if norm > 0:
        scale = 1.0
@@ -451,19 +1049,69 @@ def change_wind_direction(dx, dy):
        WIND_VECTOR = [0, 0]
     print(f"Wind vector changed to: [{WIND_VECTOR[0]:.2f}, {WIND_VECTOR[1]:.2f}]")
 
+# --- Derived Constants ---
+def update_derived_constants():
+    # Recomputes the per-step values derived from the constants at the top of the file,
+    # for callers that change those after import. Call set_grid_size() afterwards so the
+    # seed bank is reallocated with the new number of cohorts.
+    global SEED_COHORTS, SEED_DORMANCY_STEPS
+    global YOUNG_MORTALITY_STEP, BASE_MATURE_MORTALITY_STEP, MAX_SENESCENCE_MORTALITY_STEP
+    SEED_COHORTS = int(SEED_EXPIRY_YEARS / YEARS_PER_UPDATE) + 1
+    SEED_DORMANCY_STEPS = int(SEED_DORMANCY_YEARS / YEARS_PER_UPDATE)
+    YOUNG_MORTALITY_STEP = 1.0 - (1.0 - YOUNG_MORTALITY_ANNUAL) ** YEARS_PER_UPDATE
+    BASE_MATURE_MORTALITY_STEP = 1.0 - (1.0 - BASE_MATURE_MORTALITY_ANNUAL) ** YEARS_PER_UPDATE
+    MAX_SENESCENCE_MORTALITY_STEP = 1.0 - (1.0 - MAX_SENESCENCE_MORTALITY_ANNUAL) ** YEARS_PER_UPDATE
+
+# --- Grid Size ---
+def set_grid_size(width_tiles, height_tiles):
+    # Resizes the grid and everything derived from it; call initialize_simulation() afterwards
+    global WIDTH_TILES, HEIGHT_TILES, MAX_GRID_DIST, sq_width, sq_height
+    global soil_moisture, soil_nutrients, tree_mask, died_mask, tree_birth_step, seed_bank, seed_counts
+    WIDTH_TILES, HEIGHT_TILES = width_tiles, height_tiles
+    MAX_GRID_DIST = math.sqrt(WIDTH_TILES**2 + HEIGHT_TILES**2)
+    sq_width = WINDOW_WIDTH / WIDTH_TILES
+    sq_height = WINDOW_HEIGHT / HEIGHT_TILES
+    wind_blocks.clear()
+
+    soil_moisture = np.zeros((WIDTH_TILES, HEIGHT_TILES))
+    soil_nutrients = np.zeros((WIDTH_TILES, HEIGHT_TILES))
+    tree_mask = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=bool)
+    died_mask = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=bool)
+    tree_birth_step = np.full((WIDTH_TILES, HEIGHT_TILES), -1, dtype=np.int32)
+    seed_bank = np.zeros((SEED_COHORTS, WIDTH_TILES, HEIGHT_TILES), dtype=np.uint8)
+    seed_counts = np.zeros((WIDTH_TILES, HEIGHT_TILES), dtype=np.int32)
+    reset_view()
+    mark_grid_changed()
+
 # --- Simulation ---
 def initialize_simulation():
-    global current_year, current_half_year, selected_tile, simulation_active, tree_count, tree_percentage, grid
+    global current_year, current_half_year, selected_tile, simulation_active, tree_count, tree_percentage, grid, soil_sources
+    global death_num, seed_step
     current_year = 0.0
     current_half_year = 0
     selected_tile = None
     simulation_active = False
     tree_count = 0
     tree_percentage = 0.0
+    death_num = 0
+    seed_step = 0
 
     grid = [[Tile() for _ in range(HEIGHT_TILES)] for _ in range(WIDTH_TILES)]
-
-    initialize_soil_conditions()
+    tree_mask.fill(False)
+    died_mask.fill(False)
+    tree_birth_step.fill(-1)
+    seed_bank.fill(0)
+    seed_counts.fill(0)
+
+    if SOIL_MOISTURE_RASTER is not None or SOIL_NUTRIENT_RASTER is not None:
+        load_soil_rasters()
+    else:
+        soil_sources = None
+        initialize_soil_conditions()
+    load_wind_field()
+    if RECORD_PATH is not None:
+        start_recording()
+    mark_grid_changed()
     print("Simulation reset.")
 
 # --- Core ---
@@ -482,6 +1130,8 @@ def main():
     running = True
     while running:
         for event in pygame.event.get():
+            if handle_view_event(event):
+                continue
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
@@ -511,10 +1161,8 @@ def main():
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_x, mouse_y = pygame.mouse.get_pos()
-                # Convert pixel coordinates to grid coordinates using floor division
-                # This maps continuous mouse position to discrete grid tiles
-                tile_x = int(mouse_x // sq_width)
-                tile_y = int(mouse_y // sq_height)
+                # Convert pixel coordinates to grid coordinates through the current pan / zoom
+                tile_x, tile_y = screen_to_tile(mouse_x, mouse_y)
 
                 if 0 <= tile_x < WIDTH_TILES and 0 <= tile_y < HEIGHT_TILES:
                     if event.button == 1:
@@ -542,8 +1190,95 @@ def main():
 
         clock.tick(60)
 
+    stop_recording()
+    pygame.quit()
+    sys.exit()
+
+# --- Replay Viewer ---
+def draw_timeline(step, last_step):
+    bar_rect = pygame.Rect(20, WINDOW_HEIGHT - TIMELINE_HEIGHT, WINDOW_WIDTH - 40, 12)
+    pygame.draw.rect(window, (80, 80, 80), bar_rect)
+    filled = bar_rect.copy()
+    filled.width = int(bar_rect.width * step / max(1, last_step))
+    pygame.draw.rect(window, (200, 200, 200), filled)
+    return bar_rect
+
+def replay_main():
+    global drawn_frame
+    log = ReplayLog(REPLAY_PATH)
+    set_grid_size(log.meta['width'], log.meta['height'])
+    years_per_update = log.meta['years_per_update']
+    steps_per_year = int(1 / years_per_update)
+
+    step = 0
+    shown_step = None
+    playing = False
+    scrubbing = False
+    bar_rect = draw_timeline(0, log.last_step)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if handle_view_event(event):
+                continue
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_LEFT:
+                    step -= steps_per_year
+                elif event.key == pygame.K_RIGHT:
+                    step += steps_per_year
+                elif event.key == pygame.K_PAGEDOWN:
+                    step -= 50 * steps_per_year
+                elif event.key == pygame.K_PAGEUP:
+                    step += 50 * steps_per_year
+                elif event.key == pygame.K_HOME:
+                    step = 0
+                elif event.key == pygame.K_END:
+                    step = log.last_step
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                scrubbing = bar_rect.inflate(0, 20).collidepoint(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                scrubbing = False
+
+        if scrubbing:
+            mouse_x = pygame.mouse.get_pos()[0]
+            step = round((mouse_x - bar_rect.x) / bar_rect.width * log.last_step)
+        elif playing:
+            step += 1
+        step = max(0, min(log.last_step, step))
+
+        if step != shown_step:
+            birth_step, seeds, moisture, nutrients = log.state_at(step)
+            shown_step = step
+
+        frame = (step, view_x, view_y, view_zoom)
+        if frame != drawn_frame:
+            draw_tiles(('replay', step), step, years_per_update, birth_step, seeds, moisture, nutrients)
+            drawn_frame = frame
+
+        window.fill((30, 30, 30))
+        window.blit(grid_surface, (0, 0))
+        year_text = font.render(f"Replay Year: {step * years_per_update:.1f}  Trees: {np.count_nonzero(birth_step >= 0)}",
+                                True, (255, 255, 255))
+        window.blit(year_text, (20, 20))
+        instruction_text = small_font.render("Drag timeline or LEFT/RIGHT (1 yr), PGUP/PGDN (50 yrs), SPACE to play.",
+                                             True, (255, 255, 255))
+        window.blit(instruction_text, (20, WINDOW_HEIGHT - TIMELINE_HEIGHT - 22))
+        bar_rect = draw_timeline(step, log.last_step)
+        pygame.display.flip()
+
+        clock.tick(60)
+
     pygame.quit()
     sys.exit()
 
 if __name__ == "__main__":
-    main()
+    if REPLAY_PATH is not None:
+        replay_main()
+    else:
+        main()
@@ -0,0 +1,457 @@
+import ast
+import asyncio
+import hashlib
+import importlib.util
+import json
+import math
+import multiprocessing
+import os
+import queue
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# --- Server Constants ---
+HOST = "127.0.0.1"
+PORT = 8765
+UNIX_SOCKET = None  # set to a path to listen on a Unix socket instead of HOST:PORT
+MAX_WORKERS = os.cpu_count() or 1  # one simulation per core
+MAX_QUEUED_JOBS = 64  # further submissions are rejected with 503 until the queue drains
+MAX_CACHED_JOBS = 256  # finished jobs kept for lookup and reuse, least recently used dropped first
+MAX_GRID_TILES = 4000 * 4000  # largest width * height a scenario may ask for
+MAX_REQUEST_BYTES = 1 << 20
+PROGRESS_EVERY_YEARS = 10
+SIMULATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Updated Trees 2D.py")
+
+# Scenario keys a client may send, with their defaults
+SCENARIO_DEFAULTS = {
+    "width": 200,
+    "height": 160,
+    "soil": None,  # {"moisture": path, "nutrients": path, "shape": [rows, cols], "dtype": "float32"}
+    "seeds": [],  # [[x, y], ...]
+    "wind": None,  # [x, y]; drawn from the scenario's seed when omitted
+    "wind_field": None,  # path to a (rows, cols, 2) .npy wind raster, replacing the uniform wind
+    "parameters": {},  # overrides for any of MODEL_PARAMETERS
+    "years": 100,
+    "seed": 2025,
+}
+
+# Simulation constants a scenario may override, with the (min, max) each must lie within.
+# Everything else (paths, recording, display, grid size) is the server's to set.
+MODEL_PARAMETERS = {
+    "GROWTH_PROBABILITY": (0.0, 1.0),
+    "GERMINATION_AGE": (0.0, None),
+    "MAST_FREQUENCY_MIN": (0.0, None),
+    "MAST_FREQUENCY_MAX": (0.0, None),
+    "BIRD_MIGRATION_FACTOR": (-360.0, 360.0),
+    "SEED_DORMANCY_YEARS": (0.0, None),
+    "SEED_EXPIRY_YEARS": (0.0, 100.0),
+    "MAX_MOISTURE_FOR_GERMINATION": (0.0, 1.0),
+    "ANIMAL_DISPERSAL_PROPORTION": (0.0, 1.0),
+    "PARETO_ALPHA": (0.1, None),
+    "PARETO_SCALE": (0.0, None),
+    "WIND_DIRECTION_STD_DEV": (0.0, 360.0),
+    "SEED_WIND_MAGNITUDE_FACTOR": (0.0, None),
+    "WIND_BASE_DISTANCE_MULT": (0.0, None),
+    "WIND_DISTANCE_VARIATION": (0.0, 2.0),
+    "WIND_SEASONAL_ROTATION": (-360.0, 360.0),
+    "WIND_SEASONAL_STRENGTH": (0.0, None),
+    "WATER_CONSUMPTION_RATE": (0.0, 1.0),
+    "NUTRIENT_CONSUMPTION_RATE": (0.0, 1.0),
+    "WATER_RETURN_RATE": (0.0, 1.0),
+    "NUTRIENT_RETURN_RATE": (0.0, 1.0),
+    "SOIL_DIFFUSION_RATE": (0.0, 0.25),
+    "YOUNG_AGE_THRESHOLD": (0.0, None),
+    "YOUNG_MORTALITY_ANNUAL": (0.0, 1.0),
+    "BASE_MATURE_MORTALITY_ANNUAL": (0.0, 1.0),
+    "SENESCENCE_MIDPOINT": (1.0, 500.0),  # with the steepness cap, keeps math.exp in lifecycle from overflowing
+    "SENESCENCE_STEEPNESS": (0.0, 1.0),
+    "MAX_SENESCENCE_MORTALITY_ANNUAL": (0.0, 1.0),
+}
+
+# --- Worker (runs in the pool processes) ---
+sim = None
+progress_queue = None
+
+def init_worker(progress):
+    global progress_queue
+    progress_queue = progress
+    # Each worker is one simulation; keep numpy from spawning threads on top of the pool
+    os.environ["OMP_NUM_THREADS"] = "1"
+    os.environ["OPENBLAS_NUM_THREADS"] = "1"
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+def load_simulation():
+    # The simulation is a script, so load it by path. pygame opens a dummy display.
+    global sim
+    if sim is None:
+        spec = importlib.util.spec_from_file_location("xylonomial_sim", SIMULATION_PATH)
+        sim = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sim)
+    return sim
+
+def collect_metrics():
+    return {
+        "year": sim.current_year,
+        "tree_count": sim.tree_count,
+        "tree_percentage": sim.tree_percentage,
+        "deaths": sim.death_num,
+        "banked_seeds": int(sim.seed_counts.sum()),
+    }
+
+def run_scenario(job_id, scenario):
+    load_simulation()
+    # Workers are reused between jobs, so put overridden constants back afterwards
+    originals = {name: getattr(sim, name) for name in scenario["parameters"]}
+    try:
+        for name, value in scenario["parameters"].items():
+            setattr(sim, name, value)
+        sim.update_derived_constants()
+        return simulate(job_id, scenario)
+    finally:
+        sim.stop_recording()
+        for name, value in originals.items():
+            setattr(sim, name, value)
+        sim.update_derived_constants()
+
+def simulate(job_id, scenario):
+    import random
+    import numpy as np
+
+    soil = scenario["soil"] or {}
+    sim.SOIL_MOISTURE_RASTER = soil.get("moisture")
+    sim.SOIL_NUTRIENT_RASTER = soil.get("nutrients")
+    sim.SOIL_RASTER_SHAPE = tuple(soil["shape"]) if soil.get("shape") else None
+    sim.SOIL_RASTER_DTYPE = soil.get("dtype", "float32")
+    sim.WIND_FIELD = scenario["wind_field"]
+
+    random.seed(scenario["seed"])
+    np.random.seed(scenario["seed"])
+    # The simulation draws WIND_VECTOR when it is imported, before any job's seed is set
+    if scenario["wind"] is not None:
+        sim.WIND_VECTOR = list(scenario["wind"])
+    else:
+        sim.WIND_VECTOR = [random.random() * 2 - 1, random.random() * 2 - 1]
+    sim.set_grid_size(scenario["width"], scenario["height"])
+    sim.initialize_simulation()
+    for x, y in scenario["seeds"]:
+        sim.place_initial_seed(x, y)
+
+    steps = int(scenario["years"] / sim.YEARS_PER_UPDATE)
+    steps_per_report = max(1, int(PROGRESS_EVERY_YEARS / sim.YEARS_PER_UPDATE))
+    history = []
+    for step in range(1, steps + 1):
+        sim.update_simulation()
+        if step % steps_per_report == 0 or step == steps:
+            metrics = collect_metrics()
+            history.append(metrics)
+            progress_queue.put((job_id, metrics))
+
+    xs, ys = np.nonzero(sim.tree_mask)
+    return {
+        "metrics": history,
+        "trees": [[int(x), int(y), sim.grid[x][y].tree_age] for x, y in zip(xs, ys)],
+    }
+
+# --- Jobs ---
+def simulation_defaults():
+    # Values of the MODEL_PARAMETERS as the simulation assigns them, read without importing it
+    with open(SIMULATION_PATH) as f:
+        tree = ast.parse(f.read())
+    defaults = {}
+    for node in tree.body:
+        targets = node.targets if isinstance(node, ast.Assign) else [getattr(node, "target", None)]
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in MODEL_PARAMETERS:
+                defaults[target.id] = ast.literal_eval(node.value)
+    missing = set(MODEL_PARAMETERS) - set(defaults)
+    if missing:
+        raise RuntimeError(f"MODEL_PARAMETERS not assigned in {SIMULATION_PATH}: {sorted(missing)}")
+    return defaults
+
+SIMULATION_DEFAULTS = simulation_defaults()
+
+def is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def is_number(value):
+    # json.loads accepts NaN and Infinity, which no parameter should be
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def is_pair(value, check):
+    return isinstance(value, list) and len(value) == 2 and all(check(v) for v in value)
+
+def normalize_scenario(raw):
+    # Rejects anything the worker would fail on, so bad requests never take a pool slot
+    if not isinstance(raw, dict):
+        raise ValueError("Scenario must be a JSON object")
+    unknown = set(raw) - set(SCENARIO_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown scenario keys: {sorted(unknown)}")
+    scenario = {**SCENARIO_DEFAULTS, **raw}
+
+    for key in ("width", "height"):
+        if not is_int(scenario[key]) or scenario[key] < 1:
+            raise ValueError(f"{key} must be a positive integer")
+    if scenario["width"] * scenario["height"] > MAX_GRID_TILES:
+        raise ValueError(f"width * height must be at most {MAX_GRID_TILES}")
+    if not is_number(scenario["years"]) or scenario["years"] < 0:
+        raise ValueError("years must be a non-negative number")
+    # np.random.seed only takes 32 bit seeds
+    if not is_int(scenario["seed"]) or not 0 <= scenario["seed"] < 2**32:
+        raise ValueError("seed must be an integer from 0 to 2**32 - 1")
+    if not isinstance(scenario["seeds"], list) or not all(is_pair(p, is_int) for p in scenario["seeds"]):
+        raise ValueError("seeds must be a list of [x, y] integer pairs")
+    if scenario["wind"] is not None and not is_pair(scenario["wind"], is_number):
+        raise ValueError("wind must be an [x, y] pair of numbers")
+    if scenario["wind_field"] is not None and not isinstance(scenario["wind_field"], str):
+        raise ValueError("wind_field must be a path")
+
+    soil = scenario["soil"]
+    if soil is not None:
+        if not isinstance(soil, dict) or set(soil) - {"moisture", "nutrients", "shape", "dtype"}:
+            raise ValueError("soil must be an object with moisture, nutrients and optionally shape and dtype")
+        if not all(isinstance(soil.get(key), str) for key in ("moisture", "nutrients")):
+            raise ValueError("soil.moisture and soil.nutrients must both be paths")
+        if soil.get("shape") is not None and not (is_pair(soil["shape"], is_int) and min(soil["shape"]) > 0):
+            raise ValueError("soil.shape must be a [rows, cols] pair of positive integers")
+        if soil.get("dtype", "float32") not in ("float16", "float32", "float64"):
+            raise ValueError("soil.dtype must be float16, float32 or float64")
+
+    if not isinstance(scenario["parameters"], dict):
+        raise ValueError("parameters must be an object")
+    for name, value in scenario["parameters"].items():
+        if name not in MODEL_PARAMETERS:
+            raise ValueError(f"{name} is not a model parameter that can be overridden")
+        low, high = MODEL_PARAMETERS[name]
+        if not is_number(value) or value < low or (high is not None and value > high):
+            raise ValueError(f"{name} must be a number from {low} to {high if high is not None else 'any'}")
+    model = {**SIMULATION_DEFAULTS, **scenario["parameters"]}
+    if model["SEED_DORMANCY_YEARS"] > model["SEED_EXPIRY_YEARS"]:
+        raise ValueError("SEED_DORMANCY_YEARS can't be longer than SEED_EXPIRY_YEARS")
+    return scenario
+
+def raster_fingerprint(path):
+    # mtime and size of a raster file, or of each chunk in a chunked raster directory
+    try:
+        if os.path.isdir(path):
+            return sorted([name, *raster_fingerprint(os.path.join(path, name))] for name in os.listdir(path))
+        stat = os.stat(path)
+    except OSError as e:
+        raise ValueError(f"Cannot read raster {path}: {e.strerror}")
+    return [stat.st_mtime_ns, stat.st_size]
+
+def scenario_key(scenario):
+    # Identical scenarios (after defaults are filled in) share a key and so a result.
+    # Rasters are read by path, so their fingerprints go in too: replacing a file means a new run.
+    paths = [scenario["soil"]["moisture"], scenario["soil"]["nutrients"]] if scenario["soil"] else []
+    if scenario["wind_field"] is not None:
+        paths.append(scenario["wind_field"])
+    rasters = {path: raster_fingerprint(path) for path in paths}
+    return hashlib.sha256(json.dumps([scenario, rasters], sort_keys=True).encode()).hexdigest()[:16]
+
+class Job:
+    def __init__(self, job_id, scenario):
+        self.id = job_id
+        self.scenario = scenario
+        self.status = "queued"
+        self.progress = []
+        self.result = None
+        self.error = None
+        self.changed = asyncio.Condition()
+
+    def summary(self):
+        return {"job": self.id, "status": self.status, "progress": self.progress[-1:],
+                "result": self.result, "error": self.error}
+
+    async def update(self, **fields):
+        async with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.changed.notify_all()
+
+class JobService:
+    def __init__(self):
+        self.jobs = OrderedDict()  # scenario key -> Job, doubling as the result cache, oldest first
+        self.queue = asyncio.Queue(MAX_QUEUED_JOBS)
+        # Workers come from a fork server rather than forking the server itself, so they
+        # don't hold copies of client sockets that would keep those connections open
+        self.context = multiprocessing.get_context("forkserver")
+        self.progress_queue = None
+        self.pool = None
+
+    def start_pool(self):
+        self.pool = ProcessPoolExecutor(MAX_WORKERS, mp_context=self.context,
+                                        initializer=init_worker, initargs=(self.progress_queue,))
+
+    def submit(self, raw):
+        scenario = normalize_scenario(raw)
+        job_id = scenario_key(scenario)
+        if job_id in self.jobs and self.jobs[job_id].status != "failed":
+            return self.get(job_id), True
+        job = Job(job_id, scenario)
+        self.queue.put_nowait(job)  # raises asyncio.QueueFull when saturated
+        self.jobs[job_id] = job
+        self.jobs.move_to_end(job_id)
+        self.evict_finished()
+        return job, False
+
+    def get(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            self.jobs.move_to_end(job_id)
+        return job
+
+    def evict_finished(self):
+        # Least recently used finished jobs go first; queued and running ones are always kept
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= MAX_CACHED_JOBS:
+                break
+            if self.jobs[job_id].status in ("done", "failed"):
+                del self.jobs[job_id]
+
+    async def run_jobs(self):
+        # MAX_WORKERS of these run at once, so the pool is never handed more than it can run
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            await job.update(status="running")
+            pool = self.pool
+            try:
+                result = await loop.run_in_executor(pool, run_scenario, job.id, job.scenario)
+                await job.update(status="done", result=result)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for running out of memory), which breaks the whole
+                # pool; the first job to notice replaces it so later jobs can still run
+                if self.pool is pool:
+                    pool.shutdown(wait=False)
+                    self.start_pool()
+                await job.update(status="failed", error=repr(e))
+            except Exception as e:
+                await job.update(status="failed", error=repr(e))
+            self.evict_finished()
+            self.queue.task_done()
+
+    def next_progress(self):
+        # Short timeout so the waiting thread doesn't hold up shutdown
+        try:
+            return self.progress_queue.get(timeout=0.5)
+        except queue.Empty:
+            return None, None
+
+    async def forward_progress(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id, metrics = await loop.run_in_executor(None, self.next_progress)
+            job = self.jobs.get(job_id)
+            if job is not None:
+                await job.update(progress=job.progress + [metrics])
+
+    async def start(self):
+        # Called before the server starts listening
+        self.progress_queue = self.context.Manager().Queue()
+        self.start_pool()
+        self.tasks = [asyncio.create_task(self.run_jobs()) for _ in range(MAX_WORKERS)]
+        self.tasks.append(asyncio.create_task(self.forward_progress()))
+
+# --- HTTP ---
+# POST /jobs            submit a scenario, returns {"job": id, "cached": bool}
+# GET  /jobs/<id>       current status, latest progress and result
+# GET  /jobs/<id>/events  newline-delimited JSON progress, ending with the final status
+async def read_request(reader):
+    request_line = (await reader.readline()).decode().split()
+    if len(request_line) < 2:
+        return None, None, None
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        length = -1
+    if not 0 <= length <= MAX_REQUEST_BYTES:
+        raise ValueError(f"Bad Content-Length: {headers['content-length']}")
+    body = await reader.readexactly(length)
+    return request_line[0], request_line[1], body
+
+async def send_json(writer, status, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+async def stream_events(writer, job):
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                 b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+    sent = 0
+    while True:
+        async with job.changed:
+            await job.changed.wait_for(lambda: len(job.progress) > sent or job.status in ("done", "failed"))
+            lines = job.progress[sent:]
+            finished = job.status in ("done", "failed")
+        sent += len(lines)
+        if finished:
+            lines = lines + [job.summary()]
+        for line in lines:
+            chunk = json.dumps(line).encode() + b"\n"
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+        await writer.drain()
+        if finished:
+            break
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            try:
+                method, path, body = await read_request(reader)
+            except ValueError as e:
+                await send_json(writer, "400 Bad Request", {"error": str(e)})
+                return
+            parts = [part for part in (path or "").split("/") if part]
+            if method == "POST" and parts == ["jobs"]:
+                try:
+                    job, cached = service.submit(json.loads(body or b"{}"))
+                except (ValueError, TypeError) as e:
+                    await send_json(writer, "400 Bad Request", {"error": str(e)})
+                except asyncio.QueueFull:
+                    await send_json(writer, "503 Service Unavailable", {"error": "job queue is full"})
+                else:
+                    await send_json(writer, "200 OK", {"job": job.id, "cached": cached, "status": job.status})
+            elif method == "GET" and len(parts) >= 2 and parts[0] == "jobs" and parts[1] in service.jobs:
+                job = service.get(parts[1])
+                if parts[2:] == ["events"]:
+                    await stream_events(writer, job)
+                else:
+                    await send_json(writer, "200 OK", job.summary())
+            else:
+                await send_json(writer, "404 Not Found", {"error": f"no route for {method} {path}"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    return handle
+
+async def serve():
+    service = JobService()
+    await service.start()
+    if UNIX_SOCKET is not None:
+        server = await asyncio.start_unix_server(make_handler(service), path=UNIX_SOCKET)
+        print(f"Job server listening on {UNIX_SOCKET} with {MAX_WORKERS} workers")
+    else:
+        server = await asyncio.start_server(make_handler(service), HOST, PORT)
+        print(f"Job server listening on http://{HOST}:{PORT} with {MAX_WORKERS} workers")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        sys.exit()
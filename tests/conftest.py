@@ -0,0 +1,19 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIMULATION_PATH = os.path.join(REPO_ROOT, "Updated Trees 2D.py")
+sys.path.insert(0, REPO_ROOT)  # so tests can import job_server
+
+@pytest.fixture
+def sim():
+    # The simulation is a script full of module-level state, so every test loads a fresh copy
+    spec = importlib.util.spec_from_file_location("xylonomial_sim", SIMULATION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module.stop_recording()
@@ -0,0 +1,101 @@
+import os
+import queue
+
+import numpy as np
+import pytest
+
+import job_server
+
+SMALL = {"width": 40, "height": 30, "years": 20, "seeds": [[10, 10], [30, 20]]}
+
+@pytest.mark.parametrize("raw", [
+    [1],
+    {"nope": 1},
+    {"parameters": [1]},
+    {"parameters": {"RECORD_PATH": "/tmp"}},
+    {"parameters": {"WIDTH_TILES": 10}},
+    {"parameters": {"GROWTH_PROBABILITY": "x"}},
+    {"parameters": {"GROWTH_PROBABILITY": 2}},
+    {"parameters": {"GROWTH_PROBABILITY": float("nan")}},
+    {"parameters": {"SEED_EXPIRY_YEARS": 1}},  # shorter than the default dormancy
+    {"seeds": 5},
+    {"seeds": [[1, True]]},
+    {"width": 0},
+    {"width": 100000, "height": 100000},
+    {"years": -1},
+    {"seed": -5},
+    {"seed": 2**40},
+    {"wind": [1]},
+    {"wind_field": 3},
+    {"soil": {"moisture": "a"}},
+    {"soil": {"moisture": "a", "nutrients": "b", "dtype": "object"}},
+])
+def test_bad_scenarios_are_rejected(raw):
+    with pytest.raises(ValueError):
+        job_server.normalize_scenario(raw)
+
+def test_scenario_defaults_are_filled_in():
+    scenario = job_server.normalize_scenario({"parameters": {"GROWTH_PROBABILITY": 0.2}})
+    assert set(scenario) == set(job_server.SCENARIO_DEFAULTS)
+    assert scenario["width"] == job_server.SCENARIO_DEFAULTS["width"]
+    assert scenario["parameters"] == {"GROWTH_PROBABILITY": 0.2}
+
+def test_simulation_defaults_are_read_from_the_script():
+    assert set(job_server.SIMULATION_DEFAULTS) == set(job_server.MODEL_PARAMETERS)
+    assert job_server.SIMULATION_DEFAULTS["SEED_EXPIRY_YEARS"] == 30
+
+def test_scenario_key(tmp_path):
+    key = job_server.scenario_key
+    normalize = job_server.normalize_scenario
+    # Spelling out a default doesn't make a different scenario
+    assert key(normalize({})) == key(normalize({"width": job_server.SCENARIO_DEFAULTS["width"]}))
+    assert key(normalize({})) != key(normalize({"seed": 1}))
+
+    path = tmp_path / "soil.npy"
+    np.save(path, np.zeros((10, 10), dtype=np.float32))
+    with_soil = normalize({"soil": {"moisture": str(path), "nutrients": str(path)}})
+    before = key(with_soil)
+    assert key(with_soil) == before
+    np.save(path, np.ones((20, 20), dtype=np.float32))  # replaced at the same path
+    os.utime(path, ns=(1, 1))
+    assert key(with_soil) != before
+
+    with pytest.raises(ValueError):
+        key(normalize({"soil": {"moisture": str(tmp_path / "missing.npy"), "nutrients": str(path)}}))
+
+def test_identical_scenarios_share_a_job():
+    service = job_server.JobService()
+    job, cached = service.submit(SMALL)
+    assert not cached
+    again, cached = service.submit(dict(SMALL))
+    assert cached and again is job
+
+    # A failed job is run again rather than served from the cache
+    job.status = "failed"
+    retry, cached = service.submit(SMALL)
+    assert not cached and retry is not job
+
+def test_only_finished_jobs_are_evicted(monkeypatch):
+    monkeypatch.setattr(job_server, "MAX_CACHED_JOBS", 3)
+    service = job_server.JobService()
+    jobs = [service.submit({**SMALL, "seed": seed})[0] for seed in range(5)]
+    assert len(service.jobs) == 5  # all still queued
+
+    for job in jobs[:4]:
+        job.status = "done"
+    service.get(jobs[0].id)  # most recently used now
+    service.evict_finished()
+    assert list(service.jobs) == [jobs[3].id, jobs[4].id, jobs[0].id]
+
+def test_run_scenario_is_reproducible_and_restores_overrides(monkeypatch):
+    monkeypatch.setattr(job_server, "progress_queue", queue.Queue())
+    scenario = job_server.normalize_scenario(SMALL)
+    first = job_server.run_scenario("a", scenario)
+    assert job_server.run_scenario("b", scenario) == first
+
+    sim = job_server.sim
+    defaults = sim.SEED_COHORTS, sim.YOUNG_MORTALITY_STEP
+    overridden = job_server.normalize_scenario({**SMALL, "parameters": {"SEED_EXPIRY_YEARS": 10}})
+    job_server.run_scenario("c", overridden)
+    assert (sim.SEED_EXPIRY_YEARS, sim.SEED_COHORTS, sim.YOUNG_MORTALITY_STEP) == (30, *defaults)
+    assert job_server.run_scenario("d", scenario) == first
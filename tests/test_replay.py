@@ -0,0 +1,34 @@
+import random
+
+import numpy as np
+
+def test_replay_matches_live_run(sim, tmp_path):
+    random.seed(2025)
+    np.random.seed(2025)
+    sim.RECORD_PATH = str(tmp_path)
+    sim.set_grid_size(40, 30)
+    sim.initialize_simulation()
+    for x, y in [(5, 5), (20, 15), (35, 25)]:
+        sim.place_initial_seed(x, y)
+
+    steps = int(150 / sim.YEARS_PER_UPDATE)
+    sampled = set(np.linspace(1, steps, 16).astype(int))
+    live = {}
+    for _ in range(steps):
+        sim.update_simulation()
+        if sim.seed_step in (37, 141, 200):
+            # Seeds placed by hand between steps are part of the step before them
+            for x in range(0, 40, 4):
+                sim.place_initial_seed(x, sim.seed_step % 30)
+            sampled.add(sim.seed_step)
+        if sim.seed_step in sampled:
+            live[sim.seed_step] = (sim.tree_birth_step.copy(), sim.seed_counts.copy())
+    sim.stop_recording()
+    assert sim.tree_mask.any()
+
+    replay = sim.ReplayLog(str(tmp_path))
+    assert replay.last_step == steps
+    for step in sorted(live, reverse=True):  # newest first, so keyframes are reloaded
+        birth_step, seeds, _, _ = replay.state_at(step)
+        np.testing.assert_array_equal(birth_step, live[step][0], err_msg=f"trees at step {step}")
+        np.testing.assert_array_equal(seeds, live[step][1], err_msg=f"seeds at step {step}")
@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+
+def empty_grid(sim):
+    random.seed(1)
+    np.random.seed(1)
+    sim.set_grid_size(12, 10)
+    sim.initialize_simulation()
+
+def test_seeds_expire_after_seed_expiry_years(sim):
+    empty_grid(sim)
+    sim.MAX_MOISTURE_FOR_GERMINATION = -1.0  # nothing can germinate
+    sim.add_seed(3, 4)
+
+    for step in range(1, sim.SEED_COHORTS):
+        sim.age_seed_bank()
+        sim.germinate_seed_bank()
+        age = step * sim.YEARS_PER_UPDATE
+        assert sim.seed_age_range(3, 4) == (age, age)
+        assert sim.seed_counts[3, 4] == 1
+    assert age == sim.SEED_EXPIRY_YEARS
+
+    sim.age_seed_bank()
+    assert sim.seed_age_range(3, 4) is None
+    assert sim.seed_counts[3, 4] == 0
+    assert not sim.seed_bank.any()
+
+def test_seeds_germinate_once_dormancy_ends(sim):
+    empty_grid(sim)
+    sim.GROWTH_PROBABILITY = 1.0
+    sim.soil_moisture.fill(0.5)
+    sim.soil_nutrients.fill(1.0)
+    sim.add_seed(3, 4)
+    sim.add_seed(3, 4)
+    sim.age_seed_bank()
+    sim.add_seed(3, 4)  # a half year younger than the others
+
+    for _ in range(sim.SEED_DORMANCY_STEPS - 1):
+        sim.germinate_seed_bank()
+        assert not sim.tree_mask.any()
+        sim.age_seed_bank()
+
+    sim.germinate_seed_bank()
+    assert sim.tree_mask[3, 4] and sim.grid[3][4].has_tree
+    assert sim.tree_birth_step[3, 4] == sim.seed_step
+    # The seedling takes the whole tile, including the still dormant seed
+    assert sim.seed_counts[3, 4] == 0
+    assert not sim.seed_bank[:, 3, 4].any()
+
+def test_cohort_counts_saturate(sim):
+    empty_grid(sim)
+    for _ in range(300):
+        sim.add_seed(0, 0)
+    assert sim.seed_bank[:, 0, 0].sum() == 255
+    assert sim.seed_counts[0, 0] == 255
+
+def test_seed_counts_track_the_bank(sim):
+    empty_grid(sim)
+    for x in range(0, 12, 3):
+        sim.place_initial_seed(x, 5)
+    for _ in range(200):
+        sim.update_simulation()
+        np.testing.assert_array_equal(sim.seed_counts, sim.seed_bank.sum(axis=0, dtype=np.int32))
+        has_tree = np.array([[tile.has_tree for tile in column] for column in sim.grid])
+        np.testing.assert_array_equal(sim.tree_mask, has_tree)
+    assert sim.tree_mask.any()
+
+def test_initial_seed_refuses_occupied_tiles(sim):
+    empty_grid(sim)
+    assert sim.place_initial_seed(2, 2)
+    assert not sim.place_initial_seed(2, 2)
+    assert sim.seed_counts[2, 2] == 1
+    assert not sim.place_initial_seed(-1, 2)
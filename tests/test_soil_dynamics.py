@@ -0,0 +1,61 @@
+import numpy as np
+
+def soil_grid(sim):
+    sim.set_grid_size(30, 20)
+    sim.initialize_simulation()
+    rng = np.random.default_rng(5)
+    sim.soil_moisture[:] = rng.uniform(0.2, 0.8, sim.soil_moisture.shape)
+    sim.soil_nutrients[:] = rng.uniform(0.2, 0.8, sim.soil_nutrients.shape)
+
+def test_diffusion_conserves_totals(sim):
+    soil_grid(sim)
+    field = sim.soil_moisture.copy()
+    total = field.sum()
+    for _ in range(50):
+        sim.diffuse_soil(field, None)
+    assert np.isclose(field.sum(), total, rtol=1e-12)
+    assert field.std() < sim.soil_moisture.std()  # and it does spread
+
+def test_diffusion_skips_unloaded_tiles(sim):
+    soil_grid(sim)
+    field = sim.soil_moisture.copy()
+    active = np.zeros(field.shape, dtype=bool)
+    active[:15] = True
+    sim.diffuse_soil(field, active)
+    np.testing.assert_array_equal(field[15:], sim.soil_moisture[15:])
+    assert np.isclose(field[:15].sum(), sim.soil_moisture[:15].sum(), rtol=1e-12)
+
+def test_uptake_under_trees_and_return_on_death(sim, monkeypatch):
+    soil_grid(sim)
+    monkeypatch.setattr(sim, "SOIL_DIFFUSION_RATE", 0.0)
+    before_moisture, before_nutrients = sim.soil_moisture.copy(), sim.soil_nutrients.copy()
+    sim.tree_mask[3, 4] = True
+    sim.died_mask[10, 10] = True
+
+    sim.update_soil()
+    moisture_change = sim.soil_moisture - before_moisture
+    nutrient_change = sim.soil_nutrients - before_nutrients
+    assert np.isclose(moisture_change[3, 4], -sim.WATER_CONSUMPTION_RATE * sim.YEARS_PER_UPDATE)
+    assert np.isclose(nutrient_change[3, 4], -sim.NUTRIENT_CONSUMPTION_RATE * sim.YEARS_PER_UPDATE)
+    assert np.isclose(moisture_change[10, 10], sim.WATER_RETURN_RATE)
+    assert np.isclose(nutrient_change[10, 10], sim.NUTRIENT_RETURN_RATE)
+
+    moisture_change[3, 4] = moisture_change[10, 10] = 0
+    nutrient_change[3, 4] = nutrient_change[10, 10] = 0
+    assert not moisture_change.any() and not nutrient_change.any()
+    assert not sim.died_mask.any()  # deaths are only returned once
+
+def test_update_soil_conserves_totals_without_trees(sim):
+    soil_grid(sim)
+    totals = sim.soil_moisture.sum(), sim.soil_nutrients.sum()
+    for _ in range(20):
+        sim.update_soil()
+    assert np.allclose((sim.soil_moisture.sum(), sim.soil_nutrients.sum()), totals, rtol=1e-12)
+
+def test_count_trees_follows_the_mask(sim):
+    sim.set_grid_size(30, 20)
+    sim.initialize_simulation()
+    sim.tree_mask[:3, :2] = True
+    sim.count_trees()
+    assert sim.tree_count == 6
+    assert sim.tree_percentage == 6 / 600 * 100
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+WIDTH, HEIGHT = 40, 30
+
+def write_rasters(tmp_path, values):
+    # The same raster as a .npy file, a raw binary file and a directory of .npy chunks
+    np.save(tmp_path / "soil.npy", values)
+    values.tofile(tmp_path / "soil.bin")
+    chunk_dir = tmp_path / "chunks"
+    chunk_dir.mkdir()
+    chunk_rows, chunk_cols = 20, 30
+    for row in range(0, values.shape[0], chunk_rows):
+        for col in range(0, values.shape[1], chunk_cols):
+            chunk = values[row:row + chunk_rows, col:col + chunk_cols]
+            np.save(chunk_dir / f"r{row // chunk_rows}_c{col // chunk_cols}.npy", chunk)
+    return [str(tmp_path / "soil.npy"), str(tmp_path / "soil.bin"), str(chunk_dir)]
+
+def load_all_soil(sim, path, shape):
+    sim.SOIL_MOISTURE_RASTER = sim.SOIL_NUTRIENT_RASTER = path
+    sim.SOIL_RASTER_SHAPE = shape
+    sim.set_grid_size(WIDTH, HEIGHT)
+    sim.initialize_simulation()
+    for x in range(0, WIDTH, sim.SOIL_BLOCK_TILES):
+        for y in range(0, HEIGHT, sim.SOIL_BLOCK_TILES):
+            sim.fault_in_soil(x, y)
+    assert sim.soil_loaded_mask().all()
+    return sim.soil_moisture.copy()
+
+def brute_force_resample(values):
+    # Mean of the raster cells under each tile, or the nearest cell when the raster is coarser
+    rows, cols = values.shape
+    expected = np.empty((WIDTH, HEIGHT))
+    for x in range(WIDTH):
+        for y in range(HEIGHT):
+            r0, r1 = y * rows // HEIGHT, (y + 1) * rows // HEIGHT
+            c0, c1 = x * cols // WIDTH, (x + 1) * cols // WIDTH
+            expected[x, y] = values[r0:max(r1, r0 + 1), c0:max(c1, c0 + 1)].mean()
+    return expected
+
+@pytest.mark.parametrize("shape", [(97, 83), (12, 9)])
+def test_raster_formats_match_area_average(sim, tmp_path, shape):
+    values = np.random.default_rng(7).random(shape, dtype=np.float32)
+    expected = brute_force_resample(values.astype(np.float64))
+
+    for path in write_rasters(tmp_path, values):
+        moisture = load_all_soil(sim, path, shape)
+        np.testing.assert_allclose(moisture, expected, atol=1e-7, err_msg=os.path.basename(path))
+
+def test_only_loads_blocks_that_are_touched(sim, tmp_path):
+    values = np.random.default_rng(7).random((97, 83), dtype=np.float32)
+    sim.SOIL_MOISTURE_RASTER = sim.SOIL_NUTRIENT_RASTER = write_rasters(tmp_path, values)[0]
+    sim.set_grid_size(WIDTH, HEIGHT)
+    sim.initialize_simulation()
+    assert not sim.soil_loaded_mask().any()
+
+    sim.add_seed(WIDTH - 1, 0)
+    loaded = sim.soil_loaded_mask()
+    assert loaded[WIDTH - 1, 0] and not loaded[0, 0]
+    assert (sim.soil_moisture[~loaded] == 0).all()
+
+def test_one_raster_without_the_other_is_rejected(sim, tmp_path):
+    np.save(tmp_path / "soil.npy", np.zeros((10, 10), dtype=np.float32))
+    sim.SOIL_NUTRIENT_RASTER = str(tmp_path / "soil.npy")
+    with pytest.raises(ValueError, match="SOIL_MOISTURE_RASTER"):
+        sim.initialize_simulation()
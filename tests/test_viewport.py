@@ -0,0 +1,84 @@
+import math
+
+import numpy as np
+import pytest
+
+def test_block_sum_pads_ragged_edges(sim):
+    field = np.random.default_rng(1).integers(0, 10, (37, 23))
+    for block in (1, 2, 3, 4, 8):
+        sums = sim.block_sum(field, block)
+        assert sums.shape == (-(-37 // block), -(-23 // block))
+        for bx in range(sums.shape[0]):
+            for by in range(sums.shape[1]):
+                assert sums[bx, by] == field[bx * block:(bx + 1) * block, by * block:(by + 1) * block].sum()
+
+def test_density_pyramid_levels_are_block_sums(sim):
+    sim.set_grid_size(70, 45)
+    rng = np.random.default_rng(2)
+    birth_step = np.where(rng.random((70, 45)) < 0.4, rng.integers(0, 100, (70, 45)), -1)
+    seeds = rng.integers(0, 3, (70, 45))
+    moisture, nutrients = rng.random((70, 45)), rng.random((70, 45))
+    loaded_blocks = rng.random((5, 3)) < 0.5
+
+    sim.build_density_pyramid("v", birth_step, seeds, moisture, nutrients, loaded_blocks)
+    version, levels = sim.density_pyramid
+    assert version == "v"
+    assert levels[-1][0].shape == (2, 1)  # halved until one side is a single block
+    everything = (slice(0, 70), slice(0, 45))
+    channels = list(sim.heatmap_channels(everything, birth_step, seeds, moisture, nutrients, loaded_blocks))
+    assert channels[1].sum() == (birth_step >= 0).sum()
+    for k, level in enumerate(levels, start=1):
+        for channel, sums in zip(channels, level):
+            np.testing.assert_allclose(sums, sim.block_sum(channel.astype(np.float64), 2 ** k), rtol=1e-5)
+
+def test_clamp_view_keeps_the_grid_on_screen(sim):
+    sim.set_grid_size(400, 300)
+    sim.view_zoom = 4.0
+    tile_w, tile_h = sim.tile_pixels()
+    for x, y in [(-50.0, -3.0), (10.0, 20.0), (1e6, 1e6)]:
+        sim.view_x, sim.view_y = x, y
+        sim.clamp_view()
+        assert 0 <= sim.view_x <= 400 - sim.WINDOW_WIDTH / tile_w
+        assert 0 <= sim.view_y <= 300 - sim.WINDOW_HEIGHT / tile_h
+    assert (sim.view_x, sim.view_y) == (400 - sim.WINDOW_WIDTH / tile_w, 300 - sim.WINDOW_HEIGHT / tile_h)
+
+def test_zoom_keeps_the_tile_under_the_cursor(sim):
+    sim.set_grid_size(400, 300)
+    before = sim.screen_to_tile(300, 200)
+    sim.zoom_view(3.0, 300, 200)
+    assert sim.view_zoom == 3.0
+    assert sim.screen_to_tile(300, 200) == before
+
+    sim.zoom_view(1e6, 300, 200)
+    assert min(sim.tile_pixels()) == pytest.approx(sim.MAX_TILE_PIXELS)
+    sim.zoom_view(1e-6, 300, 200)
+    assert sim.view_zoom == 1.0 and (sim.view_x, sim.view_y) == (0.0, 0.0)
+
+def test_pan_moves_the_view_by_whole_pixels_of_tiles(sim):
+    sim.set_grid_size(400, 300)
+    sim.zoom_view(4.0, 0, 0)
+    tile_w, tile_h = sim.tile_pixels()
+    sim.pan_view(-10 * tile_w, -5 * tile_h)
+    assert (sim.view_x, sim.view_y) == pytest.approx((10.0, 5.0))
+
+@pytest.mark.parametrize("zoom", [1.0, 1.7, 3.0, 12.0, 40.0])
+def test_visible_region_covers_the_window(sim, zoom):
+    sim.set_grid_size(5000, 3000)
+    sim.zoom_view(zoom, 123, 77)
+    sim.pan_view(-31, -17)
+    region = sim.visible_region()
+    tile_w, tile_h = sim.tile_pixels()
+    block = sim.heatmap_block()
+
+    assert region[0].start <= sim.view_x and region[1].start <= sim.view_y
+    assert region[0].stop >= min(5000, sim.view_x + sim.WINDOW_WIDTH / tile_w)
+    assert region[1].stop >= min(3000, sim.view_y + sim.WINDOW_HEIGHT / tile_h)
+    if block:
+        # Heatmap blocks are powers of two about a pixel across, aligned to the grid
+        assert block == 2 ** round(math.log2(block))
+        assert 0.5 <= block * min(tile_w, tile_h) <= 2 or block == 1
+        assert region[0].start % block == 0 and region[1].start % block == 0
+        # however far the view is zoomed out, the heatmap stays about the size of the window
+        assert (region[0].stop - region[0].start) / block <= 2 * sim.WINDOW_WIDTH
+    else:
+        assert min(tile_w, tile_h) >= sim.LOD_MIN_TILE_PIXELS
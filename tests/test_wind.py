@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+
+from test_soil_rasters import HEIGHT, WIDTH, brute_force_resample
+
+def reset(sim):
+    sim.set_grid_size(WIDTH, HEIGHT)
+    sim.initialize_simulation()
+
+def assert_wind_matches(sim, wind_x, wind_y):
+    # The lookup tables must give what the old per-seed atan2 / hypot did
+    for half_year in (0, 1):
+        sim.current_half_year = half_year
+        for x in range(WIDTH):
+            for y in range(HEIGHT):
+                angle, magnitude = sim.wind_at(x, y)
+                expected_angle = math.degrees(math.atan2(wind_y[x, y], wind_x[x, y]))
+                expected_magnitude = math.hypot(wind_x[x, y], wind_y[x, y])
+                if half_year == 1:
+                    expected_angle += sim.WIND_SEASONAL_ROTATION
+                    expected_magnitude *= sim.WIND_SEASONAL_STRENGTH
+                assert math.isclose(angle, expected_angle, abs_tol=1e-9)
+                assert math.isclose(magnitude, expected_magnitude, abs_tol=1e-9)
+
+def test_uniform_wind_with_seasons(sim):
+    sim.WIND_VECTOR = [0.3, -0.4]
+    sim.WIND_SEASONAL_ROTATION = 30.0
+    sim.WIND_SEASONAL_STRENGTH = 1.5
+    reset(sim)
+    assert_wind_matches(sim, np.full((WIDTH, HEIGHT), 0.3), np.full((WIDTH, HEIGHT), -0.4))
+
+    sim.change_wind_direction(0, 1)
+    sim.current_half_year = 0
+    assert math.isclose(sim.wind_at(5, 5)[0], 90.0)
+
+def test_wind_field_is_resampled_lazily(sim, tmp_path):
+    values = np.random.default_rng(3).normal(size=(57, 71, 2))
+    np.save(tmp_path / "wind.npy", values)
+    sim.WIND_FIELD = str(tmp_path / "wind.npy")
+    sim.WIND_SEASONAL_ROTATION = -45.0
+    sim.WIND_SEASONAL_STRENGTH = 0.5
+    reset(sim)
+    assert not sim.wind_blocks
+
+    sim.wind_at(WIDTH - 1, 0)
+    assert list(sim.wind_blocks) == [((WIDTH - 1) // sim.SOIL_BLOCK_TILES, 0)]
+
+    assert_wind_matches(sim, brute_force_resample(values[:, :, 0]), brute_force_resample(values[:, :, 1]))